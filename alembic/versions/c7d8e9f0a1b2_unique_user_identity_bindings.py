@@ -0,0 +1,59 @@
+"""unique user identity bindings
+
+Revision ID: c7d8e9f0a1b2
+Revises: b9f8e7d6c5a4
+Create Date: 2026-04-10 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d8e9f0a1b2"
+down_revision: Union[str, Sequence[str], None] = "b9f8e7d6c5a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    unique_constraints = {item["name"] for item in inspector.get_unique_constraints("user_identities")}
+
+    # Keep the oldest binding where rows violate either rule (bind_identity already refused these).
+    # One pass with window functions instead of a self-join, which is quadratic on large duplicate groups.
+    op.execute(
+        """
+        DELETE FROM user_identities
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    id,
+                    ROW_NUMBER() OVER (PARTITION BY provider, provider_user_id ORDER BY id) AS provider_rn,
+                    ROW_NUMBER() OVER (PARTITION BY user_id, provider ORDER BY id) AS user_rn
+                FROM user_identities
+            ) ranked
+            WHERE ranked.provider_rn > 1 OR ranked.user_rn > 1
+        )
+        """
+    )
+
+    if "uq_identity_provider" not in unique_constraints:
+        op.create_unique_constraint("uq_identity_provider", "user_identities", ["provider", "provider_user_id"])
+    if "uq_identity_user_provider" not in unique_constraints:
+        op.create_unique_constraint("uq_identity_user_provider", "user_identities", ["user_id", "provider"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    unique_constraints = {item["name"] for item in inspector.get_unique_constraints("user_identities")}
+
+    if "uq_identity_user_provider" in unique_constraints:
+        op.drop_constraint("uq_identity_user_provider", "user_identities", type_="unique")
+    if "uq_identity_provider" in unique_constraints:
+        op.drop_constraint("uq_identity_provider", "user_identities", type_="unique")
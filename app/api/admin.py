@@ -8,7 +8,7 @@ from sqlmodel import select
 
 from app.core.auth import require_admin
 from app.core.db import AsyncSessionLocal
-from app.core.logging_config import log_buffer
+from app.core.logging_config import recent_logs
 from app.models.llm_trace import LLMTrace
 from app.models.settings import SystemSetting
 
@@ -65,8 +65,8 @@ def _read_env_setting(key: str) -> str:
 @router.get("/log", dependencies=[Depends(require_admin)])
 async def get_logs(limit: int = Query(100, ge=1, le=1000)):
     """Get recent logs from memory buffer."""
-    # Convert deque to list and slice last N
-    logs = list(log_buffer)[-limit:]
+    # Slice last N and format them
+    logs = recent_logs(limit)
     # Return as plain text list or joined string? Dashboard likely expects list or string.
     # Dashboard uses st.code(resp.text), so maybe just raw text?
     # But usually APIs return JSON. Let's return JSON list.
@@ -212,7 +212,10 @@ async def get_grouped_traces(limit: int = Query(50, ge=1, le=1000)):
 async def reload_mcp():
     """Reload MCP servers."""
     from app.core.mcp_manager import MCPManager
+    from app.core.worker import AgentWorker
 
     manager = MCPManager.get_instance()
     await manager.reload()
+    # Tool metadata may have changed with the plugins; rebuild the bind-time permission index
+    AgentWorker.refresh_tool_index()
     return {"status": "success", "message": "MCP servers reloaded successfully."}
@@ -134,8 +134,7 @@ async def complete_telegram_login(
         )
         raise HTTPException(status_code=400, detail="Invalid, expired, or already used login handoff")
 
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Linked user no longer exists")
 
@@ -10,6 +10,7 @@ from sqlmodel import select
 
 from app.core.auth import require_admin
 from app.core.db import get_session
+from app.core.mcp_manager import MCPManager
 from app.core.security import encrypt_secret
 from app.core.skill_loader import SkillLoader
 from app.models.plugin import Plugin
@@ -193,6 +194,7 @@ async def create_plugin(
             )
             session.add(secret_db)
         await session.commit()
+        MCPManager.invalidate_secrets(db_plugin.id)
 
     try:
         catalog = _load_plugin_catalog()
@@ -257,6 +259,8 @@ async def update_plugin(
                 session.add(new_secret)
 
     await session.commit()
+    if secrets_to_update:
+        MCPManager.invalidate_secrets(plugin.id)
 
     await session.refresh(plugin)
     return plugin
@@ -282,6 +286,7 @@ async def delete_plugin(
 
     await session.delete(plugin)
     await session.commit()
+    MCPManager.invalidate_secrets(plugin_id)
 
     removed_any_skill = False
     for skill_name in bundled_skills:
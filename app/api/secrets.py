@@ -8,6 +8,7 @@ from sqlmodel import select
 
 from app.core.auth import get_current_user
 from app.core.db import get_session
+from app.core.mcp_manager import MCPManager
 from app.core.security import encrypt_secret
 from app.models.secret import Secret, SecretScope
 from app.models.user import User
@@ -87,6 +88,7 @@ async def create_secret(
     session.add(db_secret)
     await session.commit()
     await session.refresh(db_secret)
+    MCPManager.invalidate_secrets(db_secret.plugin_id)
 
     return SecretResponse(
         id=db_secret.id,
@@ -145,6 +147,7 @@ async def update_secret(
     session.add(secret)
     await session.commit()
     await session.refresh(secret)
+    MCPManager.invalidate_secrets(secret.plugin_id)
 
     return SecretResponse(
         id=secret.id,
@@ -174,4 +177,5 @@ async def delete_secret(
 
     await session.delete(secret)
     await session.commit()
+    MCPManager.invalidate_secrets(secret.plugin_id)
     return None
@@ -2,7 +2,7 @@ import json
 import logging
 import subprocess
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.core.auth import require_admin
-from app.core.db import get_session
+from app.core.db import get_pool_status, get_session
 from app.core.mq import MQService
 from app.models.audit import AuditLog
 from app.models.user import User
@@ -30,6 +30,7 @@ class RedisStatus(BaseModel):
 
 class DatabaseStatus(BaseModel):
     status: str
+    pool: Dict[str, Any] = {}
     error: Optional[str] = None
 
 
@@ -96,7 +97,7 @@ async def get_database_status(
     """Get Database connection status (Admin only)."""
     try:
         await session.execute(text("SELECT 1"))
-        return DatabaseStatus(status="connected")
+        return DatabaseStatus(status="connected", pool=get_pool_status())
     except Exception as e:
         logger.error(f"Database status check failed: {e}")
         return DatabaseStatus(status="error", error=str(e))
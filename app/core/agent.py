@@ -3,12 +3,16 @@ import logging
 import os
 import time
 import uuid
+from functools import lru_cache
 from typing import Literal
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langgraph.graph import StateGraph
 
 from app.core.config import settings
+from app.core.decorators import request_user_scope
+from app.core.intent_gate import IntentGate
+from app.core.intent_router import IntentRouter
 from app.core.llm_utils import (
     ainvoke_with_backoff,
     build_large_output_guidance,
@@ -16,9 +20,13 @@ from app.core.llm_utils import (
     get_effective_llm_settings,
     get_llm_client,
 )
+from app.core.prompt_builder import PromptBuilder
+from app.core.semantic_cache import semantic_cache
 from app.core.session import SessionManager
+from app.core.skill_loader import SkillLoader
 from app.core.state import AgentState
 from app.core.tool_catalog import ToolCatalog
+from app.core.tool_metadata import declares_read_only
 from app.core.trace_logger import trace_logger
 from app.core.worker_dispatcher import WorkerDispatcher
 
@@ -75,22 +83,31 @@ async def _persist_message(session_id: int, message):
     asyncio.create_task(SessionManager.maybe_compact(session_id))
 
 
+@lru_cache(maxsize=512)
+def _render_memory_block(memories: tuple[str, ...]) -> str:
+    """Render retrieved memories into the system prompt block; repeated turns reuse the string."""
+    memory_context = "\\n".join(memories)
+    return (
+        f"You have the following memories and preferences:\\n{memory_context}\\n"
+        f"Use this context to personalize your response or avoid repeating mistakes."
+    )
+
+
 async def retrieve_memories(state: AgentState):
     user = state.get("user")
     if not user:
         return {"memories": []}
 
-    # We query for the last user message to find relevant memories
-    last_user_msg = ""
-    for msg in reversed(state["messages"]):
-        if msg.type == "human":
-            last_user_msg = msg.content
-            break
+    # We query for the last user message to find relevant memories.
+    # Ingest paths record it on the state; only fall back to scanning history when absent.
+    last_user_msg = state.get("last_user_content")
+    if last_user_msg is None:
+        last_user_msg = next((msg.content for msg in reversed(state["messages"]) if msg.type == "human"), "")
 
     if not last_user_msg:
         return {"memories": []}
 
-    # Importing here to avoid potential circular deps
+    # memory_manager builds its embeddings client at import, so keep it out of module load.
     from app.core.memory import memory_manager
 
     # Optimization: Skip memory retrieval for short messages (e.g. "hi", "ok", "stop")
@@ -449,6 +466,7 @@ def create_agent_graph(tools: list):
     # Standardized LLM initialization
     llm = get_llm_client()
     tools_by_name = {t.name: t for t in tools}
+    bound_llm_cache: dict[tuple, tuple[list, object]] = {}
 
     # Dynamic Instruction Injection from MCP Servers
     from app.core.mcp_manager import MCPManager
@@ -466,9 +484,6 @@ def create_agent_graph(tools: list):
         user_role = user.role if user else "guest"
 
         # 0. Build Base System Prompt with User Context
-        from app.core.prompt_builder import PromptBuilder
-        from app.core.skill_loader import SkillLoader
-
         summaries = SkillLoader.load_summaries(role=user_role)
         # We use BASE_SYSTEM_PROMPT as the "Soul" — the immutable identity core
         base_prompt_with_context = PromptBuilder.build_system_prompt(
@@ -496,8 +511,6 @@ def create_agent_graph(tools: list):
         last_human_msg = str(human_msgs[-1].content) if human_msgs else ""
 
         # 1.5 Fast Intent Gate
-        from app.core.intent_gate import IntentGate
-
         previous_error_category = None
         if state.get("last_classification"):
             previous_error_category = state["last_classification"].get("category")
@@ -583,23 +596,18 @@ def create_agent_graph(tools: list):
 
         memories = state.get("memories", [])
         if memories:
-            memory_context = "\\n".join(memories)
-            system_msg = SystemMessage(
-                content=f"You have the following memories and preferences:\\n{memory_context}\\n"
-                f"Use this context to personalize your response or avoid repeating mistakes."
-            )
+            memory_block = _render_memory_block(tuple(memories))
             # Find if there's already a system message to append to, or prepend this one
             if messages and isinstance(messages[0], SystemMessage):
-                messages[0] = SystemMessage(content=messages[0].content + "\\n\\n" + system_msg.content)
+                messages[0] = SystemMessage(content=messages[0].content + "\\n\\n" + memory_block)
             else:
-                messages.insert(0, system_msg)
+                messages.insert(0, SystemMessage(content=memory_block))
 
         large_output_guidance = build_large_output_guidance(messages)
         if large_output_guidance:
             messages.append(SystemMessage(content=large_output_guidance))
 
         # Dynamic Tool Routing
-        from app.core.intent_router import IntentRouter
         from app.core.tool_router import tool_router
 
         last_msg_content = str(messages[-1].content) if messages else "Unknown"
@@ -764,12 +772,33 @@ def create_agent_graph(tools: list):
             budget_info.get("compacted_for_budget"),
         )
 
-        # Bind only selected tools for this turn (not the full registry)
-        llm_with_tools = llm.bind_tools(current_tools)
+        # Bind only selected tools for this turn (not the full registry).
+        # Binding serializes every tool schema, so reuse the binding for a repeated toolbelt.
+        # The entry keeps the tool objects alive so their ids stay unique while cached.
+        bind_key = tuple((t.name, id(t)) for t in current_tools)
+        cached_binding = bound_llm_cache.get(bind_key)
+        if cached_binding is None:
+            if len(bound_llm_cache) >= 64:
+                bound_llm_cache.clear()
+            cached_binding = (list(current_tools), llm.bind_tools(current_tools))
+            bound_llm_cache[bind_key] = cached_binding
+        llm_with_tools = cached_binding[1]
 
         try:
             t0 = time.time()
-            response = await ainvoke_with_backoff(llm_with_tools, messages, operation_name="agent.main")
+            cache_context = (
+                semantic_cache.context_key(user, messages, [t.name for t in current_tools])
+                if settings.ENABLE_SEMANTIC_CACHE and last_human_msg
+                else None
+            )
+            if cache_context:
+                response = await semantic_cache.get_or_call(
+                    last_human_msg,
+                    cache_context,
+                    lambda: ainvoke_with_backoff(llm_with_tools, messages, operation_name="agent.main"),
+                )
+            else:
+                response = await ainvoke_with_backoff(llm_with_tools, messages, operation_name="agent.main")
             latency_ms = (time.time() - t0) * 1000
 
             logger.info(
@@ -846,7 +875,10 @@ def create_agent_graph(tools: list):
         if not last_message.tool_calls:
             return {"messages": []}
 
-        for tool_call in last_message.tool_calls:
+        # Resolve every call first; results keep the model's tool_call order.
+        results: list = [None] * len(last_message.tool_calls)
+        pending = []
+        for index, tool_call in enumerate(last_message.tool_calls):
             tool_name = tool_call["name"]
 
             # 🚑 【Universal Patch】Fix Malformed Tool Names (e.g. "forget_memoryforget_memory")
@@ -863,10 +895,8 @@ def create_agent_graph(tools: list):
 
             tool_to_call = tools_by_name.get(tool_name)
             if not tool_to_call:
-                outputs.append(
-                    ToolMessage(
-                        content=f"Error: Tool '{tool_name}' not found.", name=tool_name, tool_call_id=tool_call["id"]
-                    )
+                results[index] = ToolMessage(
+                    content=f"Error: Tool '{tool_name}' not found.", name=tool_name, tool_call_id=tool_call["id"]
                 )
                 continue
 
@@ -881,16 +911,37 @@ def create_agent_graph(tools: list):
             tool_args = {k: v for k, v in tool_call["args"].items() if v is not None}
             logger.info(f"[DEBUG None] 2. tool_args 清洗后的值: {tool_args}")
             logger.info(f"[DEBUG None] 3. dispatcher.execute_tool_call 前的最终值: {tool_args}")
-            execution_patch = await WorkerDispatcher.execute_tool_call(
+            pending.append((index, tool_name, tool_call["id"], tool_args, tool_to_call))
+
+        def _execute(tool_name, tool_call_id, tool_args, tool_to_call):
+            return WorkerDispatcher.execute_tool_call(
                 state,
                 tool_name=tool_name,
-                tool_call_id=tool_call["id"],
+                tool_call_id=tool_call_id,
                 tool_args=tool_args,
                 tool_to_call=tool_to_call,
                 user=user,
                 trace_id=trace_id,
             )
 
+        # Calls whose metadata explicitly declares a read-only operation overlap their I/O;
+        # anything else (including undeclared MCP tools) keeps the order the model emitted
+        # (e.g. "turn off" before "turn on").
+        # @with_user tools reuse the user already resolved for this turn instead of reloading it.
+        with request_user_scope(user):
+            if len(pending) > 1 and all(declares_read_only(call[4]) for call in pending):
+                patches = await asyncio.gather(*(_execute(*call[1:]) for call in pending))
+            else:
+                patches = [await _execute(*call[1:]) for call in pending]
+        for call, patch in zip(pending, patches):
+            results[call[0]] = (call[1], patch)
+
+        for result in results:
+            if isinstance(result, ToolMessage):
+                outputs.append(result)
+                continue
+            tool_name, execution_patch = result
+
             message = execution_patch.get("message")
             if message is not None:
                 outputs.append(message)
@@ -1,13 +1,14 @@
 import asyncio
+import re
 import time
 import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlmodel import select
-from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import update
 
-from app.core.db import engine
+from app.core.db import AsyncSessionLocal
+from app.core.policy import PolicyMatrix
 from app.models.audit import AuditLog
 
 
@@ -22,12 +23,8 @@ def normalize_trace_id(trace_id: uuid.UUID | str | None = None) -> uuid.UUID:
     return uuid.uuid4()
 
 
-def mask_secrets(data: Any) -> Any:
-    """Recursively mask sensitive keys in a dictionary or list."""
-    if not data:
-        return data
-
-    SECRET_KEYS = {
+SECRET_KEYS = frozenset(
+    {
         "api_key",
         "apikey",
         "token",
@@ -38,20 +35,50 @@ def mask_secrets(data: Any) -> Any:
         "credentials",
         "auth",
     }
+)
+_SECRET_KEY_RE = re.compile("|".join(map(re.escape, sorted(SECRET_KEYS))), re.IGNORECASE)
+
+
+def _contains_secret(data: Any) -> bool:
+    """Iteratively scan nested dicts/lists for a sensitive key."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if isinstance(k, str) and _SECRET_KEY_RE.search(k):
+                    return True
+                if v and isinstance(v, (dict, list)):
+                    stack.append(v)
+        else:
+            stack.extend(item for item in node if item and isinstance(item, (dict, list)))
+    return False
+
 
+def _redact(data: Any) -> Any:
     if isinstance(data, dict):
-        new_dict = {}
-        for k, v in data.items():
-            if any(sk in k.lower() for sk in SECRET_KEYS):
-                new_dict[k] = "********"
-            else:
-                new_dict[k] = mask_secrets(v)
-        return new_dict
-    elif isinstance(data, list):
-        return [mask_secrets(item) for item in data]
+        return {
+            k: "********" if isinstance(k, str) and _SECRET_KEY_RE.search(k) else _redact(v) for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [_redact(item) for item in data]
     return data
 
 
+def mask_secrets(data: Any) -> Any:
+    """
+    Mask sensitive keys in a nested dictionary or list.
+
+    Copy-on-write: the input is returned as-is unless a sensitive key is found,
+    in which case a redacted copy is built.
+    """
+    if not data or not isinstance(data, (dict, list)):
+        return data
+    if not _contains_secret(data):
+        return data
+    return _redact(data)
+
+
 async def create_audit_entry(
     trace_id: uuid.UUID | str,
     action: str,
@@ -61,7 +88,7 @@ async def create_audit_entry(
 ) -> int:
     """Creates initial PENDING audit log and returns its ID."""
     masked_args = mask_secrets(tool_args)
-    async with AsyncSession(engine) as session:
+    async with AsyncSessionLocal() as session:
         log_entry = AuditLog(
             trace_id=normalize_trace_id(trace_id),
             user_id=user_id,
@@ -91,7 +118,7 @@ async def record_audit_event(
     trace_id: uuid.UUID | str | None = None,
 ) -> int:
     """Create a completed audit event for auth/policy lifecycle transitions."""
-    async with AsyncSession(engine) as session:
+    async with AsyncSessionLocal() as session:
         log_entry = AuditLog(
             trace_id=normalize_trace_id(trace_id),
             user_id=user_id,
@@ -112,22 +139,51 @@ async def record_audit_event(
         return log_entry.id
 
 
+# Background audit writes share the DB pool with request handlers, so cap how many run at once
+# and keep strong references until they finish (the loop only holds weak ones).
+AUDIT_WRITE_CONCURRENCY = 64
+# Semaphores bind to the loop they are first awaited on, so keep one per running loop.
+_audit_write_semaphores: dict[int, asyncio.Semaphore] = {}
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _audit_write_semaphore() -> asyncio.Semaphore:
+    loop_id = id(asyncio.get_running_loop())
+    semaphore = _audit_write_semaphores.get(loop_id)
+    if semaphore is None:
+        semaphore = _audit_write_semaphores[loop_id] = asyncio.Semaphore(AUDIT_WRITE_CONCURRENCY)
+    return semaphore
+
+
+def _spawn_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _submit_audit_update(log_id: int, status: str, duration_ms: float, error_message: Optional[str]):
+    async with _audit_write_semaphore():
+        await update_audit_entry(log_id, status, duration_ms, error_message)
+
+
 async def update_audit_entry(log_id: int, status: str, duration_ms: float, error_message: Optional[str] = None):
     """Updates the existing audit log with final status."""
-    async with AsyncSession(engine) as session:
-        stmt = select(AuditLog).where(AuditLog.id == log_id)
-        result = await session.execute(stmt)
-        log_entry = result.scalars().first()
+    values: Dict[str, Any] = {
+        "status": status,
+        "duration_ms": duration_ms,
+        "completed_at": datetime.utcnow(),
+    }
+    if error_message:
+        values["error_message"] = error_message
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(AuditLog).where(AuditLog.id == log_id).values(**values))
+        await session.commit()
 
-        if log_entry:
-            log_entry.status = status
-            log_entry.duration_ms = duration_ms
-            log_entry.completed_at = datetime.utcnow()
-            if error_message:
-                log_entry.error_message = error_message
 
-            session.add(log_entry)
-            await session.commit()
+class PolicyDeniedError(PermissionError):
+    """Raised by AuditInterceptor when PolicyMatrix blocks a tool call."""
 
 
 class AuditInterceptor:
@@ -152,9 +208,7 @@ class AuditInterceptor:
         self.start_time: Optional[float] = None
 
     async def __aenter__(self):
-        self.start_time = time.time()
-
-        from app.core.policy import PolicyMatrix
+        self.start_time = time.perf_counter()
 
         allowed = PolicyMatrix.is_allowed(self.user_role, self.context, self.tool_tags)
 
@@ -177,7 +231,7 @@ class AuditInterceptor:
                 status="FAILURE",
                 error_message=error_message,
             )
-            raise PermissionError(
+            raise PolicyDeniedError(
                 f"Access Denied: Role '{self.user_role}' cannot use '{self.tool_name}' "
                 f"(Tags: {self.tool_tags}) in context '{self.context}'"
             )
@@ -195,7 +249,7 @@ class AuditInterceptor:
         if self.start_time is None:
             return
 
-        duration = (time.time() - self.start_time) * 1000
+        duration = (time.perf_counter() - self.start_time) * 1000
         status = "SUCCESS"
         error_msg = None
 
@@ -203,9 +257,10 @@ class AuditInterceptor:
             status = "FAILURE"
             error_msg = str(exc_val)
 
+            # auth_service imports this module, so resolve it lazily on the failure path only.
             from app.core.auth_service import AuthService
 
-            asyncio.create_task(
+            _spawn_background(
                 AuthService.notify_admins(
                     f"🚨 **Tool Error Alert**\n"
                     f"Tool: `{self.tool_name}`\n"
@@ -215,4 +270,4 @@ class AuditInterceptor:
             )
 
         if self.log_id is not None:
-            asyncio.create_task(update_audit_entry(self.log_id, status, duration, error_msg))
+            _spawn_background(_submit_audit_update(self.log_id, status, duration, error_msg))
@@ -1,3 +1,7 @@
+import hashlib
+import hmac
+import time
+
 import jwt
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
@@ -12,6 +16,34 @@ api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 bearer_scheme = HTTPBearer(auto_error=False)
 ALGORITHM = "HS256"
 
+# blake2b(api_key) -> (user_id, cached_at). Only ids are cached so raw keys and ORM
+# objects never outlive a request; the key is re-checked against the fetched row.
+API_KEY_CACHE_TTL_SECONDS = 60.0
+API_KEY_CACHE_MAX_ENTRIES = 10_000
+_api_key_user_ids: dict[bytes, tuple[int, float]] = {}
+
+
+def _api_key_digest(api_key: str) -> bytes:
+    return hashlib.blake2b(api_key.encode(), digest_size=16).digest()
+
+
+async def _get_user_by_api_key(session: AsyncSession, api_key: str) -> User | None:
+    digest = _api_key_digest(api_key)
+    cached = _api_key_user_ids.get(digest)
+    if cached and time.monotonic() - cached[1] < API_KEY_CACHE_TTL_SECONDS:
+        user = await session.get(User, cached[0])
+        if user and hmac.compare_digest(user.api_key, api_key):
+            return user
+    _api_key_user_ids.pop(digest, None)
+
+    result = await session.execute(select(User).where(User.api_key == api_key))
+    user = result.scalars().first()
+    if user:
+        if len(_api_key_user_ids) >= API_KEY_CACHE_MAX_ENTRIES:
+            _api_key_user_ids.pop(next(iter(_api_key_user_ids)))
+        _api_key_user_ids[digest] = (user.id, time.monotonic())
+    return user
+
 
 async def get_current_user(
     api_key: str = Security(api_key_header),
@@ -28,8 +60,7 @@ async def get_current_user(
                 detail="Invalid bearer token",
             )
 
-        result = await session.execute(select(User).where(User.id == user_id))
-        user = result.scalars().first()
+        user = await session.get(User, user_id)
 
         if not user:
             raise HTTPException(
@@ -50,8 +81,7 @@ async def get_current_user(
     # Let's strictly check DB but fall back to a mock if DB is empty?
     # No, let's Stick to the plan: Check DB.
 
-    result = await session.execute(select(User).where(User.api_key == api_key))
-    user = result.scalars().first()
+    user = await _get_user_by_api_key(session, api_key)
 
     if not user:
         raise HTTPException(
@@ -1,16 +1,19 @@
+import asyncio
 import json
 import logging
 import os
-import random
 import secrets
-import string
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import List
+from operator import itemgetter
+from typing import Callable, List
 
 import redis.asyncio as redis
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
+from sqlalchemy.orm import raiseload
 
 from app.core.audit import record_audit_event
 from app.core.db import AsyncSessionLocal
@@ -20,9 +23,51 @@ logger = logging.getLogger("nexus.auth")
 
 # Redis for temporary tokens
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+LAST_SEEN_WRITE_INTERVAL_SECONDS = 60
+BIND_TOKEN_MAX_ATTEMPTS = 5
 
 # RBAC Role Levels
 ROLE_LEVELS = {"admin": 100, "user": 50, "guest": 10}
+DEFAULT_ALLOWED_DOMAINS = frozenset({"standard", "time", "weather"})
+
+
+def _policy_sets(user: User) -> tuple[frozenset, frozenset]:
+    """Materialize the user's deny list and domain allow list as sets for O(1) membership checks."""
+    policy = user.policy or {}
+    allow_domains = policy.get("allow_domains")
+    return (
+        frozenset(policy.get("deny_tools") or ()),
+        DEFAULT_ALLOWED_DOMAINS if allow_domains is None else frozenset(allow_domains),
+    )
+
+
+def _tool_gate_fields(tool) -> tuple:
+    """The metadata fields the permission gates read: (required_role, allowed_groups, domain)."""
+    metadata = getattr(tool, "metadata", {}) or {}
+    return (
+        metadata.get("required_role"),
+        metadata.get("allowed_groups"),
+        metadata.get("domain") or metadata.get("category") or "standard",
+    )
+
+
+def build_tool_domain_index(all_tools: list) -> tuple[dict, list]:
+    """
+    Split a tool catalog into unrestricted tools bucketed by domain and role/group-gated tools.
+
+    Entries carry their catalog position so callers can restore order. Build it once where the
+    catalog is assigned (AgentWorker.set_tools) and pass it to get_allowed_tools.
+    """
+    by_domain: dict[str, list] = {}
+    gated = []
+    for position, tool in enumerate(all_tools):
+        required_role, allowed_groups, domain = _tool_gate_fields(tool)
+        if required_role or allowed_groups:
+            gated.append((position, tool, required_role, allowed_groups))
+        else:
+            by_domain.setdefault(domain, []).append((position, tool))
+    return by_domain, gated
 
 
 class BindResult(str, Enum):
@@ -59,9 +104,36 @@ class LoginHandoffStatus:
 
 
 class AuthService:
-    @staticmethod
-    def _get_redis():
-        return redis.from_url(REDIS_URL, decode_responses=True)
+    # One pooled client per event loop (same scheme as MQService), reused across calls.
+    _redis_instances: dict[int, redis.Redis] = {}
+
+    @classmethod
+    def _get_redis(cls) -> redis.Redis:
+        try:
+            loop_id = id(asyncio.get_running_loop())
+        except RuntimeError:
+            loop_id = 0
+
+        client = cls._redis_instances.get(loop_id)
+        if client is None:
+            # Blocking pool: callers wait for a free connection instead of erroring at the cap.
+            pool = redis.BlockingConnectionPool.from_url(
+                REDIS_URL, decode_responses=True, max_connections=REDIS_MAX_CONNECTIONS, timeout=5
+            )
+            client = redis.Redis(connection_pool=pool)
+            cls._redis_instances[loop_id] = client
+        return client
+
+    @classmethod
+    async def close(cls):
+        """Release the shared Redis clients (called on application shutdown)."""
+        for loop_id, client in list(cls._redis_instances.items()):
+            try:
+                await client.aclose()
+                await client.connection_pool.disconnect()
+            except Exception:
+                pass
+            del cls._redis_instances[loop_id]
 
     @staticmethod
     async def create_bind_token(user_id: int) -> str:
@@ -69,12 +141,15 @@ class AuthService:
         Generate a 6-digit numeric token for account binding.
         TTL: 5 minutes.
         """
-        token = "".join(random.choices(string.digits, k=6))
         r = AuthService._get_redis()
 
-        # Key: bind:123456 -> user_id
-        await r.setex(f"bind:{token}", 300, str(user_id))
-        await r.close()
+        # Key: bind:123456 -> user_id. NX keeps a colliding draw from hijacking another pending token.
+        for _ in range(BIND_TOKEN_MAX_ATTEMPTS):
+            token = f"{secrets.randbelow(1_000_000):06d}"
+            if await r.set(f"bind:{token}", str(user_id), ex=300, nx=True):
+                break
+        else:
+            raise RuntimeError("Could not allocate a unique bind token")
         await record_audit_event(
             action="auth.bind_token_created",
             user_id=user_id,
@@ -98,7 +173,6 @@ class AuthService:
 
         r = AuthService._get_redis()
         await r.setex(f"auth_challenge:{challenge_id}", 300, json.dumps(payload))
-        await r.close()
         await record_audit_event(
             action="auth.telegram_login_started",
             user_id=None,
@@ -117,7 +191,6 @@ class AuthService:
     async def get_telegram_login_challenge(challenge_id: str) -> dict | None:
         r = AuthService._get_redis()
         raw = await r.get(f"auth_challenge:{challenge_id}")
-        await r.close()
         if not raw:
             return None
         return json.loads(raw)
@@ -128,7 +201,6 @@ class AuthService:
         key = f"auth_challenge:{challenge_id}"
         raw = await r.get(key)
         if not raw:
-            await r.close()
             return None
 
         payload = json.loads(raw)
@@ -151,7 +223,6 @@ class AuthService:
             ttl,
             json.dumps({"challenge_id": challenge_id, "user_id": user_id}),
         )
-        await r.close()
         await record_audit_event(
             action="auth.telegram_login_approved",
             user_id=user_id,
@@ -186,7 +257,6 @@ class AuthService:
         key = f"auth_challenge:{challenge_id}"
         raw = await r.get(key)
         if not raw:
-            await r.close()
             return False
 
         payload = json.loads(raw)
@@ -201,7 +271,6 @@ class AuthService:
         ttl = await r.ttl(key)
         ttl = ttl if ttl and ttl > 0 else 300
         await r.setex(key, ttl, json.dumps(payload))
-        await r.close()
         await record_audit_event(
             action="auth.telegram_login_rejected",
             user_id=None,
@@ -218,32 +287,26 @@ class AuthService:
         challenge_key = f"auth_challenge:{challenge_id}"
         exchange_key = f"auth_exchange:{exchange_token}"
 
-        raw_challenge = await r.get(challenge_key)
-        raw_exchange = await r.get(exchange_key)
+        raw_challenge, raw_exchange = await r.mget(challenge_key, exchange_key)
 
         if not raw_challenge or not raw_exchange:
-            await r.close()
             return None
 
         challenge_payload = json.loads(raw_challenge)
         exchange_payload = json.loads(raw_exchange)
 
         if challenge_payload.get("status") != "approved":
-            await r.close()
             return None
         if challenge_payload.get("csrf_token") != csrf_token:
-            await r.close()
             return None
         if challenge_payload.get("exchange_token") != exchange_token:
-            await r.close()
             return None
         if exchange_payload.get("challenge_id") != challenge_id:
-            await r.close()
             return None
 
-        await r.delete(challenge_key)
-        await r.delete(exchange_key)
-        await r.close()
+        # One DEL for both keys; only the caller that actually removed them wins a concurrent race.
+        if not await r.delete(challenge_key, exchange_key):
+            return None
         await record_audit_event(
             action="auth.telegram_login_completed",
             user_id=int(exchange_payload["user_id"]),
@@ -256,9 +319,13 @@ class AuthService:
     async def verify_bind_token(token: str) -> int | None:
         """Return user_id if token is valid, else None."""
         r = AuthService._get_redis()
-        user_id = await r.get(f"bind:{token}")
-        await r.delete(f"bind:{token}")  # One-time use
-        await r.close()
+        key = f"bind:{token}"
+        try:
+            user_id = await r.getdel(key)  # One-time use, single round-trip
+        except redis.ResponseError:
+            # Redis < 6.2 has no GETDEL; keep GET+DEL atomic in one transaction.
+            async with r.pipeline(transaction=True) as pipe:
+                user_id, _ = await pipe.get(key).delete(key).execute()
 
         if user_id:
             return int(user_id)
@@ -270,48 +337,32 @@ class AuthService:
     ) -> BindResult:
         """Link a provider ID to a User."""
         async with AsyncSessionLocal() as session:
-            # Check if this provider ID is already taken
-            stmt = select(UserIdentity).where(
-                UserIdentity.provider == provider, UserIdentity.provider_user_id == provider_user_id
-            )
-            result = await session.execute(stmt)
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                if existing.user_id == user_id:
-                    return BindResult.SUCCESS  # Already linked correctly
-                else:
-                    logger.warning(f"Social ID {provider_user_id} already linked to another user ({existing.user_id}).")
-                    return BindResult.PROVIDER_CONFLICT  # Conflict: One social ID -> One Nexus User
-
-            # Check if this User already has an identity for this provider
-            stmt_user = select(UserIdentity).where(UserIdentity.user_id == user_id, UserIdentity.provider == provider)
-            result_user = await session.execute(stmt_user)
-            existing_user = result_user.scalar_one_or_none()
-            if existing_user:
-                logger.warning(
-                    f"User {user_id} already has a {provider} identity linked ({existing_user.provider_user_id})."
+            # Happy path is a blind INSERT: the unique constraints on user_identities reject both
+            # conflicts, and only then do we look up which one it was.
+            session.add(
+                UserIdentity(
+                    user_id=user_id,
+                    provider=provider,
+                    provider_user_id=provider_user_id,
+                    provider_username=username,
+                    last_seen=datetime.utcnow(),
                 )
-                return BindResult.USER_CONFLICT  # Conflict: One Nexus User -> One Social ID per provider
-
-            # Create new identity
-            new_id = UserIdentity(
-                user_id=user_id,
-                provider=provider,
-                provider_user_id=provider_user_id,
-                provider_username=username,
-                last_seen=datetime.utcnow(),
             )
-            session.add(new_id)
-
-            # Role Promotion: If target user is a 'guest', promote to 'user'
-            from app.models.user import User
-
-            user = await session.get(User, user_id)
-            if user and user.role == "guest":
+            try:
+                await session.flush()
+            except IntegrityError:
+                await session.rollback()
+                conflict = await AuthService._classify_bind_conflict(session, user_id, provider, provider_user_id)
+                if conflict is None:
+                    raise  # Not a binding rule (e.g. the user row no longer exists)
+                return conflict
+
+            # Role Promotion: If target user is a 'guest', promote to 'user' (single conditional UPDATE)
+            promoted = await session.execute(
+                update(User).where(User.id == user_id, User.role == "guest").values(role="user")
+            )
+            if promoted.rowcount:
                 logger.info(f"Promoting User {user_id} from guest to user upon binding.")
-                user.role = "user"
-                session.add(user)
 
             await session.commit()
             logger.info(f"Bound {provider}:{provider_user_id} to User {user_id}")
@@ -323,12 +374,46 @@ class AuthService:
             )
             return BindResult.SUCCESS
 
+    @staticmethod
+    async def _classify_bind_conflict(session, user_id: int, provider: str, provider_user_id: str) -> BindResult | None:
+        """Work out which uniqueness rule a rejected bind hit."""
+        # One query covers both conflicts: this provider ID taken, or this user already linked on provider
+        stmt = (
+            select(UserIdentity)
+            .where(
+                UserIdentity.provider == provider,
+                or_(UserIdentity.provider_user_id == provider_user_id, UserIdentity.user_id == user_id),
+            )
+            .options(raiseload("*"))
+        )
+        result = await session.execute(stmt)
+        rows = result.scalars().all()
+        existing = next((row for row in rows if row.provider_user_id == provider_user_id), None)
+        existing_user = next((row for row in rows if row.user_id == user_id), None)
+
+        if existing:
+            if existing.user_id == user_id:
+                return BindResult.SUCCESS  # Already linked correctly
+            else:
+                logger.warning(f"Social ID {provider_user_id} already linked to another user ({existing.user_id}).")
+                return BindResult.PROVIDER_CONFLICT  # Conflict: One social ID -> One Nexus User
+
+        # Check if this User already has an identity for this provider
+        if existing_user:
+            logger.warning(
+                f"User {user_id} already has a {provider} identity linked ({existing_user.provider_user_id})."
+            )
+            return BindResult.USER_CONFLICT  # Conflict: One Nexus User -> One Social ID per provider
+        return None
+
     @staticmethod
     async def unbind_identity(provider: str, provider_user_id: str) -> bool:
         """Remove a binding by provider and ID."""
         async with AsyncSessionLocal() as session:
-            stmt = select(UserIdentity).where(
-                UserIdentity.provider == provider, UserIdentity.provider_user_id == provider_user_id
+            stmt = (
+                select(UserIdentity)
+                .where(UserIdentity.provider == provider, UserIdentity.provider_user_id == provider_user_id)
+                .options(raiseload("*"))
             )
             result = await session.execute(stmt)
             identity = result.scalar_one_or_none()
@@ -349,23 +434,25 @@ class AuthService:
     async def get_user_by_identity(provider: str, provider_user_id: str) -> User | None:
         """Resolve a User from an incoming message ID."""
         async with AsyncSessionLocal() as session:
-            stmt = select(UserIdentity).where(
-                UserIdentity.provider == provider, UserIdentity.provider_user_id == provider_user_id
+            # User and identity in one round-trip instead of identity-then-user lookups
+            stmt = (
+                select(User, UserIdentity.id, UserIdentity.last_seen)
+                .join(UserIdentity, UserIdentity.user_id == User.id)
+                .where(UserIdentity.provider == provider, UserIdentity.provider_user_id == provider_user_id)
+                .options(raiseload("*"))
             )
             result = await session.execute(stmt)
-            identity = result.scalar_one_or_none()
-
-            if identity:
-                # Update last see
-                identity.last_seen = datetime.utcnow()
+            row = result.first()
+            if not row:
+                return None
+
+            user, identity_id, last_seen = row
+            now = datetime.utcnow()
+            # last_seen is coarse presence info; skip the write (and its commit) on rapid message bursts
+            if last_seen is None or (now - last_seen).total_seconds() >= LAST_SEEN_WRITE_INTERVAL_SECONDS:
+                await session.execute(update(UserIdentity).where(UserIdentity.id == identity_id).values(last_seen=now))
                 await session.commit()
-
-                # Fetch User
-                stmt_user = select(User).where(User.id == identity.user_id)
-                res_user = await session.execute(stmt_user)
-                return res_user.scalar_one_or_none()
-
-            return None
+            return user
 
     @staticmethod
     async def describe_identity_access(provider: str, provider_user_id: str) -> IdentityAccessState:
@@ -406,34 +493,46 @@ class AuthService:
     async def notify_admins(content: str, meta: dict | None = None):
         """Send a message to all users with role 'admin'."""
         async with AsyncSessionLocal() as session:
-            # 1. Find all admin users
-            stmt = select(User).where(User.role == "admin")
+            # 1. Find all admin identities in one joined query
+            stmt = (
+                select(User.username, UserIdentity.provider, UserIdentity.provider_user_id)
+                .join(UserIdentity, UserIdentity.user_id == User.id)
+                .where(User.role == "admin")
+            )
             res = await session.execute(stmt)
-            admins = res.scalars().all()
-
-            from app.core.mq import ChannelType, MessageType, MQService, UnifiedMessage
-
-            for admin in admins:
-                # 2. Get their identities
-                stmt_id = select(UserIdentity).where(UserIdentity.user_id == admin.id)
-                res_id = await session.execute(stmt_id)
-                identities = res_id.scalars().all()
-
-                for identity in identities:
-                    # 3. Push to outbox
-                    try:
-                        channel = ChannelType(identity.provider)
-                        msg = UnifiedMessage(
-                            channel=channel,
-                            channel_id=identity.provider_user_id,
-                            content=content,
-                            msg_type=MessageType.TEXT,
-                            meta=meta or {},
-                        )
-                        await MQService.push_outbox(msg)
-                        logger.info(f"Notification sent to admin {admin.username} via {channel.value}")
-                    except ValueError:
-                        logger.warning(f"Unknown channel provider: {identity.provider}")
+            admin_identities = res.all()
+
+        from app.core.mq import ChannelType, MessageType, MQService, UnifiedMessage
+
+        # 2. Build one outbox message per distinct (provider, provider_user_id)
+        recipients = []
+        seen = set()
+        for username, provider, provider_user_id in admin_identities:
+            if (provider, provider_user_id) in seen:
+                continue
+            seen.add((provider, provider_user_id))
+            try:
+                channel = ChannelType(provider)
+            except ValueError:
+                logger.warning(f"Unknown channel provider: {provider}")
+                continue
+            msg = UnifiedMessage(
+                channel=channel,
+                channel_id=provider_user_id,
+                content=content,
+                msg_type=MessageType.TEXT,
+                meta=meta or {},
+            )
+            recipients.append((username, msg))
+
+        # 3. Push everything to the outbox in one round-trip
+        try:
+            await MQService.push_outbox_many([msg for _, msg in recipients])
+        except Exception as e:
+            logger.error(f"Failed to notify admins: {e}")
+            return
+        for username, msg in recipients:
+            logger.info(f"Notification sent to admin {username} via {msg.channel.value}")
 
     @staticmethod
     def check_tool_permission(
@@ -446,10 +545,45 @@ class AuthService:
         """
         Check if user is allowed to use this tool/domain.
         """
-        policy = user.policy or {}
+        return AuthService._check_tool_permission(
+            user, _policy_sets(user), tool_name, domain, required_role, allowed_groups
+        )
+
+    @staticmethod
+    def permission_checker(user: User) -> Callable[..., bool]:
+        """
+        Return a check_tool_permission equivalent bound to ``user``.
+
+        The policy sets are materialized once, so loops over the tool catalog pay only
+        O(1) membership checks per tool.
+        """
+        policy_sets = _policy_sets(user)
+
+        def check(
+            tool_name: str,
+            domain: str = "standard",
+            required_role: str = None,
+            allowed_groups: List[str] = None,
+        ) -> bool:
+            return AuthService._check_tool_permission(
+                user, policy_sets, tool_name, domain, required_role, allowed_groups
+            )
+
+        return check
+
+    @staticmethod
+    def _check_tool_permission(
+        user: User,
+        policy_sets: tuple[frozenset, frozenset],
+        tool_name: str,
+        domain: str,
+        required_role: str | None,
+        allowed_groups: List[str] | None,
+    ) -> bool:
+        deny_tools, allow_domains = policy_sets
 
         # 1. Deny List (User-specific override) - blocks everyone
-        if tool_name in policy.get("deny_tools", []):
+        if tool_name in deny_tools:
             return False
 
         # 2. Admin bypass
@@ -465,41 +599,51 @@ class AuthService:
 
         # 4. Horizontal Gate (Group-based) - Rejections only
         if allowed_groups:
-            user_groups = set(getattr(user, "groups", []) or [])
-            if not user_groups.intersection(set(allowed_groups)):
+            if frozenset(allowed_groups).isdisjoint(getattr(user, "groups", None) or ()):
                 return False
 
         # 5. Domain Sandbox applies to unrestricted tools
         if not required_role and not allowed_groups:
-            defaults = ["standard", "time", "weather"]
-            allowed = policy.get("allow_domains", defaults)
-            if domain not in allowed:
+            if domain not in allow_domains:
                 return False
 
         # 6. All checks passed
         return True
 
     @staticmethod
-    def get_allowed_tools(user: User, all_tools: list) -> list:
+    def get_allowed_tools(user: User, all_tools: list, tool_index: tuple[dict, list] | None = None) -> list:
         """
         Return list of tools that the user is allowed to use.
+
+        ``tool_index`` is build_tool_domain_index(all_tools), prebuilt by the owner of the catalog;
+        without it every tool is checked individually.
         """
-        allowed = []
-        for tool in all_tools:
-            # We assume tool has .name attribute
-            tool_name = getattr(tool, "name", str(tool))
-            # Extract metadata from tool (MCP tools should have domain/category in metadata)
-            metadata = getattr(tool, "metadata", {}) or {}
-            domain = metadata.get("domain") or metadata.get("category") or "standard"
-            required_role = metadata.get("required_role")
-            allowed_groups = metadata.get("allowed_groups")
-
-            if AuthService.check_tool_permission(
-                user,
-                tool_name,
-                domain=domain,
-                required_role=required_role,
-                allowed_groups=allowed_groups,
-            ):
-                allowed.append(tool)
-        return allowed
+        policy_sets = _policy_sets(user)
+        deny_tools, allow_domains = policy_sets
+        if user.role == "admin":
+            # Admins pass every gate except the per-user deny list.
+            return [tool for tool in all_tools if getattr(tool, "name", str(tool)) not in deny_tools]
+
+        if tool_index is None:
+            allowed = []
+            for tool in all_tools:
+                required_role, allowed_groups, domain = _tool_gate_fields(tool)
+                if AuthService._check_tool_permission(
+                    user, policy_sets, getattr(tool, "name", str(tool)), domain, required_role, allowed_groups
+                ):
+                    allowed.append(tool)
+            return allowed
+
+        # Unrestricted tools only need their domain in the allow list; gated tools skip the
+        # domain sandbox and go through the role/group checks instead.
+        by_domain, gated = tool_index
+        allowed = [entry for domain in allow_domains for entry in by_domain.get(domain, ())]
+        allowed.extend(
+            (position, tool)
+            for position, tool, required_role, allowed_groups in gated
+            if AuthService._check_tool_permission(
+                user, policy_sets, getattr(tool, "name", str(tool)), "standard", required_role, allowed_groups
+            )
+        )
+        allowed.sort(key=itemgetter(0))
+        return [tool for _, tool in allowed if getattr(tool, "name", str(tool)) not in deny_tools]
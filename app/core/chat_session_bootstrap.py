@@ -89,6 +89,7 @@ async def build_session_state(
         "user": user,
         "trace_id": trace_id,
         "session_id": session.id,
+        "last_user_content": incoming_message,
     }
 
     return initial_state, session, created_new_thread
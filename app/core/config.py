@@ -37,6 +37,12 @@ class Settings(BaseSettings):
     SKILL_ROUTING_TOP_K: int = 3
     SKILL_ROUTING_THRESHOLD: float = 0.30
 
+    # Semantic Response Cache (opt-in; costs one embedding call per user turn)
+    ENABLE_SEMANTIC_CACHE: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 512
+    SEMANTIC_CACHE_TTL_SECONDS: int = 3600
+
     # Agent Graph
     AGENT_RECURSION_LIMIT: int = 50
     ENABLE_FAST_BRAIN: bool = False
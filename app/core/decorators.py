@@ -1,5 +1,10 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Callable
+from typing import Any, Callable
+
+# Users already loaded for the current request, keyed by id; None outside a request scope.
+_request_users: ContextVar[dict[int, Any] | None] = ContextVar("_request_users", default=None)
 
 
 # Decorators for permissions (metadata)
@@ -14,6 +19,19 @@ def require_role(role: str):
     return decorator
 
 
+@contextmanager
+def request_user_scope(*users):
+    """
+    Share loaded User objects with @with_user tools for the duration of one request.
+    Tools called inside the scope reuse these (and any user they load) instead of querying again.
+    """
+    token = _request_users.set({u.id: u for u in users if u is not None and u.id is not None})
+    try:
+        yield
+    finally:
+        _request_users.reset(token)
+
+
 def with_user(optional: bool = True):
     """
     Decorator to fetch the User object based on 'user_id' in kwargs.
@@ -25,12 +43,20 @@ def with_user(optional: bool = True):
         async def wrapper(*args, **kwargs):
             user_id = kwargs.get("user_id")
             user = None
-            if user_id:
+            cache = _request_users.get()
+            if user_id and cache is not None:
+                user = cache.get(user_id)
+            if user_id and user is None:
+                from sqlalchemy.orm import raiseload
+
                 from app.core.db import AsyncSessionLocal
                 from app.models.user import User
 
+                # The session closes before the tool runs, so fail loudly on relationship access
                 async with AsyncSessionLocal() as session:
-                    user = await session.get(User, user_id)
+                    user = await session.get(User, user_id, options=[raiseload("*")])
+                if cache is not None and user is not None:
+                    cache[user_id] = user
 
             if not optional and not user:
                 return "❌ Error: user_id is required or invalid."
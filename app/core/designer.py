@@ -1,7 +1,9 @@
+import asyncio
 import logging
 import os
+import re
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlmodel import select
 
@@ -9,6 +11,54 @@ from app.core.llm_utils import get_llm_client
 
 logger = logging.getLogger("nexus.designer")
 
+# Designer instructions never vary between calls, so they live in the system message ahead of any
+# skill data: OpenAI-compatible providers cache identical prompt prefixes automatically.
+DESIGNER_SYSTEM_PROMPT = """You are an expert at improving AI prompts. Be concise and precise.
+Analyze and improve the memory processing skill described by the user.
+
+## Task
+1. Analyze why users might be unsatisfied with these outputs
+2. Identify specific weaknesses in the current prompt
+3. Generate an IMPROVED version of the prompt template
+
+## Output Format
+Return your response in this exact structure:
+
+### Analysis
+[Your analysis of the problems]
+
+### Improved Prompt
+[The complete new prompt template, keeping {{ content }} and {{ context }} placeholders]
+"""
+
+DESIGNER_BATCH_SYSTEM_PROMPT = """You are an expert at improving AI prompts. Be concise and precise.
+Analyze and improve the memory processing skills described by the user.
+
+## Task
+For EACH skill you are given, independently:
+1. Analyze why users might be unsatisfied with its outputs
+2. Identify specific weaknesses in its current prompt
+3. Generate an IMPROVED version of its prompt template
+
+## Output Format
+Return one pair of sections per skill, using the skill's index, in this exact structure:
+
+### Skill[0] Analysis
+[Your analysis of the problems]
+
+### Skill[0] Improved Prompt
+[The complete new prompt template, keeping {{ content }} and {{ context }} placeholders]
+
+### Skill[1] Analysis
+...
+"""
+
+_BATCH_SECTION_RE = re.compile(r"^###\s*Skill\[(\d+)\]\s*(Analysis|Improved Prompt)\s*$", re.MULTILINE)
+# Analysis is whatever follows "### Analysis" (or the whole preamble without one) up to "### Improved Prompt"
+_EVOLUTION_RE = re.compile(r"(?:.*?###\s*Analysis)?(.*?)###\s*Improved Prompt(.*)", re.DOTALL)
+_FENCE_LINE_RE = re.compile(r"^[ \t]*```[^\n]*(?:\n|$)", re.MULTILINE)
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(content|context)\s*\}\}")
+
 
 class MemSkillDesigner:
     """
@@ -18,13 +68,22 @@ class MemSkillDesigner:
     1. find_underperforming_skills() — identify skills with high negative rate
     2. evolve_skill()               — generate improved prompt via LLM
     3. test_canary()                — shadow-test with recent inputs
-    4. save_changelog()             — record change for admin review
+    4. _save_changelogs()           — record changes for admin review
     """
 
     # Minimum total uses before skill is eligible for evolution
     MIN_TOTAL_USES = int(os.getenv("DESIGNER_MIN_FEEDBACK", "10"))
     # Negative rate threshold to trigger evolution
     NEGATIVE_RATE_THRESHOLD = float(os.getenv("DESIGNER_THRESHOLD", "0.3"))
+    # Skills analyzed per Designer LLM call; larger batches start to cost answer quality
+    EVOLUTION_BATCH_SIZE = min(int(os.getenv("DESIGNER_BATCH_SIZE", "6")), 16)
+    # How often buffered record_feedback() counts are written to the database
+    FEEDBACK_FLUSH_SECONDS = float(os.getenv("DESIGNER_FEEDBACK_FLUSH_SECONDS", "2"))
+
+    # skill_id -> [positive, negative] deltas not yet written
+    _feedback_buffer: Dict[int, List[int]] = {}
+    # (event loop id, flush task) of the running background flush
+    _feedback_task: Optional[Tuple[int, asyncio.Task]] = None
 
     @classmethod
     async def find_underperforming_skills(cls) -> list:
@@ -35,25 +94,27 @@ class MemSkillDesigner:
         from app.core.db import AsyncSessionLocal
         from app.models.memory_skill import MemorySkill
 
+        # Rates must include feedback still sitting in the buffer
+        await cls.flush_feedback()
+
+        total = MemorySkill.positive_count + MemorySkill.negative_count
         async with AsyncSessionLocal() as session:
+            # negative / total > threshold, multiplied out to avoid division in SQL
             stmt = select(MemorySkill).where(
                 MemorySkill.status == "active",
-                (MemorySkill.positive_count + MemorySkill.negative_count) >= cls.MIN_TOTAL_USES,
+                total >= cls.MIN_TOTAL_USES,
+                MemorySkill.negative_count * 1.0 > cls.NEGATIVE_RATE_THRESHOLD * total,
             )
             result = await session.execute(stmt)
-            skills = result.scalars().all()
+            underperforming = result.scalars().all()
 
-        # Filter by negative rate in Python (easier than complex SQL with division)
-        underperforming = []
-        for skill in skills:
-            total = skill.positive_count + skill.negative_count
-            if total > 0:
-                neg_rate = skill.negative_count / total
-                if neg_rate > cls.NEGATIVE_RATE_THRESHOLD:
-                    logger.info(f"🔴 Underperforming skill: {skill.name} (neg_rate={neg_rate:.1%}, total={total})")
-                    underperforming.append(skill)
+        for skill in underperforming:
+            uses = skill.positive_count + skill.negative_count
+            logger.info(
+                f"🔴 Underperforming skill: {skill.name} (neg_rate={skill.negative_count / uses:.1%}, total={uses})"
+            )
 
-        return underperforming
+        return list(underperforming)
 
     @classmethod
     async def get_recent_samples(cls, skill_id: int, limit: int = 5) -> List[dict]:
@@ -64,149 +125,235 @@ class MemSkillDesigner:
         from app.core.db import AsyncSessionLocal
         from app.models.memory import Memory
 
+        # Only two columns are needed, so fetch plain rows instead of full Memory instances
+        stmt = (
+            select(Memory.content, Memory.created_at)
+            .where(Memory.skill_id == skill_id)
+            .order_by(Memory.created_at.desc())
+            .limit(limit)
+        )
         async with AsyncSessionLocal() as session:
-            stmt = select(Memory).where(Memory.skill_id == skill_id).order_by(Memory.created_at.desc()).limit(limit)
-            result = await session.execute(stmt)
-            memories = result.scalars().all()
+            rows = (await session.execute(stmt)).all()
 
-        return [{"content": m.content, "created_at": str(m.created_at)} for m in memories]
-
-    @classmethod
-    async def evolve_skill(cls, skill) -> Optional[dict]:
-        """
-        Generate an improved prompt for an underperforming skill.
-        """
-        from langchain_core.messages import HumanMessage, SystemMessage
-
-        # Get recent samples for context
-        samples = await cls.get_recent_samples(skill.id)
-        if not samples:
-            logger.warning(f"No samples for skill {skill.name}, skipping evolution")
-            return None
+        return [{"content": content, "created_at": str(created_at)} for content, created_at in rows]
 
+    @staticmethod
+    def _skill_brief(skill, samples: List[dict], heading: str) -> str:
+        """Describe a skill, its prompt, and recent outputs for the Designer LLM."""
         samples_text = "\n".join([f"- {s['content']}" for s in samples])
-
-        # Use Designer LLM via central utility
-        llm = get_llm_client(temperature=0.3)
-
         total = skill.positive_count + skill.negative_count
         neg_rate = skill.negative_count / total if total > 0 else 0
 
-        prompt = f"""You are a prompt engineering expert. Analyze and improve a memory processing skill.
-
-## Current Skill
+        return f"""## {heading}
 - **Name**: {skill.name}
 - **Type**: {skill.skill_type}
 - **Description**: {skill.description}
 - **Performance**: {skill.positive_count} positive / {skill.negative_count} negative ({neg_rate:.0%} failure rate)
 
-## Current Prompt Template
+### Current Prompt Template
 ```
 {skill.prompt_template}
 ```
 
-## Recent Output Samples (produced by this prompt)
+### Recent Output Samples (produced by this prompt)
 {samples_text}
+"""
 
-## Task
-1. Analyze why users might be unsatisfied with these outputs
-2. Identify specific weaknesses in the current prompt
-3. Generate an IMPROVED version of the prompt template
+    @classmethod
+    async def evolve_skill(cls, skill) -> Optional[dict]:
+        """
+        Generate an improved prompt for an underperforming skill.
+        """
+        proposal = await cls._propose_single(skill)
+        if proposal is None:
+            return None
+        return (await cls._record_evolutions([proposal]))[0]
 
-## Output Format
-Return your response in this exact structure:
+    @classmethod
+    async def _propose_single(cls, skill, samples: Optional[List[dict]] = None) -> Optional[dict]:
+        """Ask the Designer LLM for a new prompt for one skill and canary-test it (nothing is saved)."""
+        from langchain_core.messages import HumanMessage, SystemMessage
 
-### Analysis
-[Your analysis of the problems]
+        # Get recent samples for context unless the caller already fetched them
+        if samples is None:
+            samples = await cls.get_recent_samples(skill.id)
+        if not samples:
+            logger.warning(f"No samples for skill {skill.name}, skipping evolution")
+            return None
 
-### Improved Prompt
-[The complete new prompt template, keeping {{{{ content }}}} and {{{{ context }}}} placeholders]
-"""
+        # Use Designer LLM via central utility
+        llm = get_llm_client(temperature=0.3)
+
+        prompt = cls._skill_brief(skill, samples, "Current Skill")
 
         try:
             response = await llm.ainvoke(
                 [
-                    SystemMessage(content="You are an expert at improving AI prompts. Be concise and precise."),
+                    SystemMessage(content=DESIGNER_SYSTEM_PROMPT),
                     HumanMessage(content=prompt),
                 ]
             )
 
-            response_text = response.content
-
             # Parse response
-            analysis, new_prompt = cls._parse_evolution_response(response_text)
+            analysis, new_prompt = cls._parse_evolution_response(response.content)
 
             if not new_prompt:
                 logger.error(f"Failed to parse evolution response for {skill.name}")
                 return None
 
-            # Run canary test
-            canary_passed = await cls.test_canary(skill, new_prompt)
+            return await cls._canary_proposal(skill, analysis, new_prompt, samples)
+
+        except Exception as e:
+            logger.error(f"Evolution failed for {skill.name}: {e}")
+            return None
 
-            # Save changelog
-            changelog_id = await cls._save_changelog(
-                skill=skill,
-                new_prompt=new_prompt,
-                reason=analysis,
-                canary_passed=canary_passed,
+    @classmethod
+    async def evolve_skills_batch(cls, skills: list) -> List[Optional[dict]]:
+        """
+        Evolve several skills with a single Designer LLM call.
+
+        The shared instructions are sent once instead of once per skill. Returns one result per
+        input skill (None where evolution failed); skills the model's answer leaves out are
+        evolved on their own, reusing the samples already fetched.
+        """
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        all_samples = await asyncio.gather(*(cls.get_recent_samples(skill.id) for skill in skills))
+        batch = [(index, skill, samples) for index, (skill, samples) in enumerate(zip(skills, all_samples)) if samples]
+        for skill, samples in zip(skills, all_samples):
+            if not samples:
+                logger.warning(f"No samples for skill {skill.name}, skipping evolution")
+
+        results: List[Optional[dict]] = [None] * len(skills)
+        if not batch:
+            return results
+        if len(batch) == 1:
+            index, skill, samples = batch[0]
+            proposal = await cls._propose_single(skill, samples)
+            if proposal is not None:
+                results[index] = (await cls._record_evolutions([proposal]))[0]
+            return results
+
+        prompt = "\n".join(
+            cls._skill_brief(skill, samples, f"Skill[{i}]") for i, (_, skill, samples) in enumerate(batch)
+        )
+
+        try:
+            llm = get_llm_client(temperature=0.3)
+            response = await llm.ainvoke(
+                [
+                    SystemMessage(content=DESIGNER_BATCH_SYSTEM_PROMPT),
+                    HumanMessage(content=prompt),
+                ]
             )
+            parsed = cls._parse_batch_evolution_response(response.content)
+        except Exception as e:
+            logger.error(f"Batch evolution failed for {[skill.name for _, skill, _ in batch]}: {e}")
+            parsed = {}
+
+        async def propose(position: int, skill, samples: List[dict]) -> Optional[dict]:
+            analysis, new_prompt = parsed.get(position, ("", ""))
+            if not new_prompt:
+                logger.warning(f"Batch response missing {skill.name}, evolving it on its own")
+                return await cls._propose_single(skill, samples)
+            try:
+                return await cls._canary_proposal(skill, analysis, new_prompt, samples)
+            except Exception as e:
+                logger.error(f"Evolution failed for {skill.name}: {e}")
+                return None
 
+        proposals = await asyncio.gather(
+            *(propose(position, skill, samples) for position, (_, skill, samples) in enumerate(batch))
+        )
+        # The whole batch's changelogs go to the database in one transaction
+        accepted = [(index, proposal) for (index, _, _), proposal in zip(batch, proposals) if proposal]
+        recorded = await cls._record_evolutions([proposal for _, proposal in accepted])
+        for (index, _), result in zip(accepted, recorded):
+            results[index] = result
+        return results
+
+    @classmethod
+    async def _canary_proposal(
+        cls, skill, analysis: str, new_prompt: str, samples: Optional[List[dict]] = None
+    ) -> dict:
+        """Canary-test a proposed prompt; the result is recorded later by _record_evolutions()."""
+        canary_passed = await cls.test_canary(skill, new_prompt, samples=samples)
+        return {"skill": skill, "new_prompt": new_prompt, "reason": analysis, "canary_passed": canary_passed}
+
+    @classmethod
+    async def _record_evolutions(cls, proposals: List[dict]) -> List[dict]:
+        """Save changelogs for canary-tested proposals and build the evolution results."""
+        if not proposals:
+            return []
+        changelog_ids = await cls._save_changelogs(proposals)
+
+        results = []
+        for proposal, changelog_id in zip(proposals, changelog_ids):
+            skill = proposal["skill"]
             logger.info(
                 f"✅ Evolution complete for {skill.name}: "
-                f"changelog_id={changelog_id}, canary={'PASS' if canary_passed else 'FAIL'}"
+                f"changelog_id={changelog_id}, canary={'PASS' if proposal['canary_passed'] else 'FAIL'}"
+            )
+            results.append(
+                {
+                    "skill_name": skill.name,
+                    "new_prompt": proposal["new_prompt"],
+                    "reason": proposal["reason"],
+                    "canary_passed": proposal["canary_passed"],
+                    "changelog_id": changelog_id,
+                }
             )
+        return results
 
-            return {
-                "skill_name": skill.name,
-                "new_prompt": new_prompt,
-                "reason": analysis,
-                "canary_passed": canary_passed,
-                "changelog_id": changelog_id,
-            }
-
-        except Exception as e:
-            logger.error(f"Evolution failed for {skill.name}: {e}")
-            return None
+    @staticmethod
+    def _strip_code_fences(text: str) -> str:
+        text = text.strip()
+        if text.startswith("```"):
+            # Remove the ``` marker lines
+            text = _FENCE_LINE_RE.sub("", text).strip()
+        return text
 
     @classmethod
     def _parse_evolution_response(cls, text: str) -> tuple:
         """Parse the Designer LLM's response into (analysis, new_prompt)."""
-        analysis = ""
-        new_prompt = ""
-
-        # Split by '### Improved Prompt'
-        if "### Improved Prompt" in text:
-            parts = text.split("### Improved Prompt", 1)
-            analysis_part = parts[0]
-            prompt_part = parts[1] if len(parts) > 1 else ""
-
-            # Extract analysis
-            if "### Analysis" in analysis_part:
-                analysis = analysis_part.split("### Analysis", 1)[1].strip()
-            else:
-                analysis = analysis_part.strip()
+        match = _EVOLUTION_RE.match(text)
+        if not match:
+            return "", ""
+        return match.group(1).strip(), cls._strip_code_fences(match.group(2))
 
-            # Extract prompt (remove code fences if present)
-            new_prompt = prompt_part.strip()
-            if new_prompt.startswith("```"):
-                lines = new_prompt.split("\n")
-                # Remove first and last lines (``` markers)
-                lines = [line for line in lines if not line.strip().startswith("```")]
-                new_prompt = "\n".join(lines).strip()
-
-        return analysis, new_prompt
+    @classmethod
+    def _parse_batch_evolution_response(cls, text: str) -> dict:
+        """Parse a batched Designer response into {skill index: (analysis, new_prompt)}."""
+        sections: dict = {}
+        matches = list(_BATCH_SECTION_RE.finditer(text))
+        for match, following in zip(matches, matches[1:] + [None]):
+            body = text[match.end() : following.start() if following else len(text)]
+            sections.setdefault(int(match.group(1)), {})[match.group(2)] = body.strip()
+
+        parsed = {}
+        for index, parts in sections.items():
+            new_prompt = cls._strip_code_fences(parts.get("Improved Prompt", ""))
+            if new_prompt:
+                parsed[index] = (parts.get("Analysis", ""), new_prompt)
+        return parsed
 
     @classmethod
-    async def test_canary(cls, skill, new_prompt: str, test_count: int = 3) -> bool:
+    async def test_canary(
+        cls, skill, new_prompt: str, test_count: int = 3, samples: Optional[List[dict]] = None
+    ) -> bool:
         """
         Shadow-test a new prompt against recent inputs.
         Does NOT save results — just validates output quality.
 
+        Callers that already fetched the skill's recent samples (newest first) pass them in,
+        so the evolve path does not query the same rows a second time.
+
         Returns True if all tests pass.
         """
-        from langchain_core.messages import HumanMessage
-
-        samples = await cls.get_recent_samples(skill.id, limit=test_count)
+        if samples is None:
+            samples = await cls.get_recent_samples(skill.id, limit=test_count)
+        else:
+            samples = samples[:test_count]
         if not samples:
             logger.warning(f"No samples for canary test of {skill.name}")
             return True  # No data to test against, allow
@@ -214,53 +361,63 @@ Return your response in this exact structure:
         # Use runtime LLM via central utility
         llm = get_llm_client()
 
-        passed = 0
-        for sample in samples:
-            try:
-                # Render new prompt with sample content
-                test_prompt = new_prompt.replace("{{ content }}", sample["content"])
-                test_prompt = test_prompt.replace("{{ context }}", "")
-
-                response = await llm.ainvoke([HumanMessage(content=test_prompt)])
-                output = response.content.strip()
-
-                # Basic quality checks
-                if len(output) < 5:
-                    logger.warning(f"Canary output too short: '{output}'")
-                    continue
-                if len(output) > len(sample["content"]) * 3:
-                    logger.warning(f"Canary output too verbose: {len(output)} chars")
-                    continue
-
-                passed += 1
-            except Exception as e:
-                logger.error(f"Canary test failed: {e}")
+        # Samples are independent, so the LLM calls overlap: latency is the slowest call, not the sum
+        outcomes = await asyncio.gather(*(cls._run_canary_sample(llm, new_prompt, sample) for sample in samples))
+        passed = sum(outcomes)
 
         pass_rate = passed / len(samples) if samples else 0
         logger.info(f"Canary test for {skill.name}: {passed}/{len(samples)} passed ({pass_rate:.0%})")
 
         return pass_rate >= 0.6  # At least 60% must pass
 
+    @staticmethod
+    async def _run_canary_sample(llm, new_prompt: str, sample: dict) -> bool:
+        from langchain_core.messages import HumanMessage
+
+        try:
+            # Render new prompt with sample content (context is left empty) in one pass
+            values = {"content": sample["content"], "context": ""}
+            test_prompt = _PLACEHOLDER_RE.sub(lambda match: values[match.group(1)], new_prompt)
+
+            response = await llm.ainvoke([HumanMessage(content=test_prompt)])
+            output = response.content.strip()
+
+            # Basic quality checks
+            if len(output) < 5:
+                logger.warning(f"Canary output too short: '{output}'")
+                return False
+            if len(output) > len(sample["content"]) * 3:
+                logger.warning(f"Canary output too verbose: {len(output)} chars")
+                return False
+
+            return True
+        except Exception as e:
+            logger.error(f"Canary test failed: {e}")
+            return False
+
     @classmethod
-    async def _save_changelog(cls, skill, new_prompt: str, reason: str, canary_passed: bool) -> int:
-        """Save evolution record to MemorySkillChangelog."""
+    async def _save_changelogs(cls, proposals: List[dict]) -> List[int]:
+        """Save evolution records to MemorySkillChangelog in a single transaction."""
         from app.core.db import AsyncSessionLocal
         from app.models.memory_skill import MemorySkillChangelog
 
-        changelog = MemorySkillChangelog(
-            skill_id=skill.id,
-            skill_name=skill.name,
-            old_prompt=skill.prompt_template,
-            new_prompt=new_prompt,
-            reason=reason,
-            status="canary" if canary_passed else "rejected",
-        )
+        changelogs = [
+            MemorySkillChangelog(
+                skill_id=proposal["skill"].id,
+                skill_name=proposal["skill"].name,
+                old_prompt=proposal["skill"].prompt_template,
+                new_prompt=proposal["new_prompt"],
+                reason=proposal["reason"],
+                status="canary" if proposal["canary_passed"] else "rejected",
+            )
+            for proposal in proposals
+        ]
 
         async with AsyncSessionLocal() as session:
-            session.add(changelog)
+            session.add_all(changelogs)
+            # Primary keys are populated by the flush, so no per-row refresh is needed
             await session.commit()
-            await session.refresh(changelog)
-            return changelog.id
+            return [changelog.id for changelog in changelogs]
 
     @classmethod
     async def approve_changelog(cls, changelog_id: int) -> str:
@@ -346,9 +503,13 @@ Return your response in this exact structure:
             logger.info(msg)
             return msg
 
+        # One Designer call per batch; batches run concurrently
+        size = max(cls.EVOLUTION_BATCH_SIZE, 1)
+        chunks = [underperforming[i : i + size] for i in range(0, len(underperforming), size)]
+        batch_results = await asyncio.gather(*(cls.evolve_skills_batch(chunk) for chunk in chunks))
+
         results = []
-        for skill in underperforming:
-            result = await cls.evolve_skill(skill)
+        for skill, result in zip(underperforming, (r for batch in batch_results for r in batch)):
             if result:
                 status = "✅ Canary passed" if result["canary_passed"] else "⚠️ Canary failed"
                 results.append(f"- **{skill.name}**: {status} (changelog #{result['changelog_id']})")
@@ -384,23 +545,87 @@ Return your response in this exact structure:
 
     @classmethod
     async def record_feedback(cls, skill_id: int, is_positive: bool):
-        """Record implicit feedback for a skill."""
-        from app.core.db import AsyncSessionLocal
-        from app.models.memory_skill import MemorySkill
+        """
+        Record implicit feedback for a skill.
 
+        Counts are buffered in memory and written by a background flush every
+        FEEDBACK_FLUSH_SECONDS, so a burst of feedback costs one UPDATE batch instead of a
+        SELECT + UPDATE + COMMIT per event.
+        """
         if not skill_id:
             return
 
-        async with AsyncSessionLocal() as session:
-            skill = await session.get(MemorySkill, skill_id)
-            if skill:
-                if is_positive:
-                    skill.positive_count += 1
-                else:
-                    skill.negative_count += 1
-                skill.updated_at = datetime.utcnow()
+        counts = cls._feedback_buffer.setdefault(skill_id, [0, 0])
+        counts[0 if is_positive else 1] += 1
+        logger.debug("Feedback for skill %s: %s (buffered)", skill_id, "👍" if is_positive else "👎")
+
+        loop_id = id(asyncio.get_running_loop())
+        if cls._feedback_task is None or cls._feedback_task[0] != loop_id or cls._feedback_task[1].done():
+            cls._feedback_task = (loop_id, asyncio.create_task(cls._feedback_flush_loop()))
+
+    @classmethod
+    async def _feedback_flush_loop(cls):
+        # Runs while feedback keeps arriving; record_feedback restarts it after an idle flush.
+        while True:
+            await asyncio.sleep(cls.FEEDBACK_FLUSH_SECONDS)
+            try:
+                await cls.flush_feedback()
+            except Exception as e:
+                logger.error(f"Failed to flush skill feedback: {e}")
+            if not cls._feedback_buffer:
+                return
+
+    @classmethod
+    async def stop_feedback_flusher(cls):
+        """Cancel the background flush loop (shutdown); buffered counts stay for a final flush_feedback()."""
+        if cls._feedback_task is None:
+            return
+        _, task = cls._feedback_task
+        cls._feedback_task = None
+        if task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    @classmethod
+    async def flush_feedback(cls):
+        """Apply buffered feedback counts with a single executemany UPDATE."""
+        from sqlalchemy import bindparam, update
+
+        from app.core.db import AsyncSessionLocal
+        from app.models.memory_skill import MemorySkill
+
+        if not cls._feedback_buffer:
+            return
+        pending, cls._feedback_buffer = cls._feedback_buffer, {}
+
+        table = MemorySkill.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                positive_count=table.c.positive_count + bindparam("b_positive"),
+                negative_count=table.c.negative_count + bindparam("b_negative"),
+                updated_at=bindparam("b_now"),
+            )
+        )
+        now = datetime.utcnow()
+        params = [
+            {"b_id": skill_id, "b_positive": positive, "b_negative": negative, "b_now": now}
+            for skill_id, (positive, negative) in pending.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt, params)
                 await session.commit()
-                logger.debug(
-                    f"Feedback for '{skill.name}': {'👍' if is_positive else '👎'} "
-                    f"(+{skill.positive_count}/-{skill.negative_count})"
-                )
+        except Exception:
+            # Put the counts back so the next flush retries them
+            for skill_id, (positive, negative) in pending.items():
+                counts = cls._feedback_buffer.setdefault(skill_id, [0, 0])
+                counts[0] += positive
+                counts[1] += negative
+            raise
+        logger.debug("Flushed feedback for %d skills", len(params))
@@ -1,50 +1,74 @@
 import asyncio
 import logging
-from typing import Callable, Dict
+import os
+import random
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
 
 from app.core.mq import ChannelType, MQService
 
 logger = logging.getLogger("nexus.dispatcher")
 
+# Downstream answers worth retrying; any other status (e.g. 400/403) will not succeed on a retry
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# python-telegram-bot reports timeouts and connection drops with these (BadRequest/Forbidden are permanent)
+_TRANSIENT_ERROR_NAMES = frozenset({"TimedOut", "NetworkError"})
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    status = getattr(exc, "status", None)  # aiohttp.ClientResponseError
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Seconds the downstream asked us to wait, from a Retry-After header or a RetryAfter error."""
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is None and isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("Retry-After")
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None  # HTTP-date form; fall back to our own backoff
+
+
+def _is_transient(exc: Exception) -> bool:
+    status = _status_code(exc)
+    if status is not None:
+        return status in TRANSIENT_STATUS_CODES
+    if _retry_after(exc) is not None:
+        return True
+    return isinstance(exc, (httpx.TimeoutException, httpx.TransportError, TimeoutError, ConnectionError)) or (
+        type(exc).__name__ in _TRANSIENT_ERROR_NAMES
+    )
+
 
 class InterfaceDispatcher:
     """
     Consumes messages from MQ Outbox and routes them to the correct interface adapter.
     """
 
+    # Concurrent senders; messages for one chat always go to the same worker, so they stay in order
+    WORKERS = int(os.getenv("DISPATCHER_WORKERS", "8"))
+    # Cap on in-flight sends per channel, to stay under provider rate limits
+    CHANNEL_CONCURRENCY = int(os.getenv("DISPATCHER_CHANNEL_CONCURRENCY", "4"))
+    QUEUE_SIZE = 100
+
     _send_handlers: Dict[ChannelType, Callable] = {}
     _running = False
     _task = None
+    _queues: List[asyncio.Queue] = []
+    _workers: List[asyncio.Task] = []
+    _channel_limits: Dict[ChannelType, asyncio.Semaphore] = {}
 
     @classmethod
     async def get_handler(cls, channel: ChannelType):
-        if channel == ChannelType.TELEGRAM:
-            # Lazy import to avoid circular dependencies
-            from app.interfaces.telegram import send_telegram_message
-
-            return send_telegram_message
-
-        elif channel == ChannelType.FEISHU:
-            from app.interfaces.feishu import send_feishu_message
-
-            return send_feishu_message
-        elif channel == ChannelType.WECHAT:
-            from app.interfaces.wechat import send_wechat_message
-
-            return send_wechat_message
-
-        elif channel == ChannelType.DINGTALK:
-            # Placeholder for DingTalk
-            # from app.interfaces.dingtalk import send_dingtalk_message
-            # return send_dingtalk_message
-            pass
-
-        elif channel in cls._send_handlers:  # Corrected from cls._handlers
-            return cls._send_handlers[channel]
-
-        return None
-        # This line is unreachable due to the return None above it.
-        # logger.info(f"Registered Outbound Handler for: {channel.value}")
+        return cls._send_handlers.get(channel)
 
     @classmethod
     def register_handler(cls, channel: ChannelType, handler: Callable):
@@ -55,18 +79,38 @@ class InterfaceDispatcher:
         cls._send_handlers[channel] = handler
         logger.info(f"Registered Outbound Handler for: {channel.value}")
 
+    @classmethod
+    def _register_builtin_handlers(cls):
+        """Register the bundled interfaces' senders once, unless their bots registered already."""
+        # Lazy import to avoid circular dependencies (the interfaces import this module)
+        from app.interfaces.feishu import send_feishu_message
+        from app.interfaces.telegram import send_telegram_message
+        from app.interfaces.wechat import send_wechat_message
+
+        for channel, handler in (
+            (ChannelType.TELEGRAM, send_telegram_message),
+            (ChannelType.FEISHU, send_feishu_message),
+            (ChannelType.WECHAT, send_wechat_message),
+        ):
+            if channel not in cls._send_handlers:
+                cls.register_handler(channel, handler)
+
     @classmethod
     async def start(cls):
-        """Start the dispatcher loop."""
+        """Start the dispatcher loop and its sender workers."""
         if cls._running:
             return
         cls._running = True
+        cls._register_builtin_handlers()
+        cls._channel_limits = {}
+        cls._queues = [asyncio.Queue(maxsize=cls.QUEUE_SIZE) for _ in range(max(cls.WORKERS, 1))]
+        cls._workers = [asyncio.create_task(cls._worker(queue)) for queue in cls._queues]
         cls._task = asyncio.create_task(cls._loop())
-        logger.info("Interface Dispatcher Started.")
+        logger.info(f"Interface Dispatcher Started ({len(cls._workers)} workers).")
 
     @classmethod
-    async def stop(cls):
-        """Stop the dispatcher loop."""
+    async def stop(cls, drain_timeout: float = 5.0):
+        """Stop pulling from the outbox, give queued sends a moment to finish, then stop workers."""
         cls._running = False
         if cls._task:
             cls._task.cancel()
@@ -74,53 +118,133 @@ class InterfaceDispatcher:
                 await cls._task
             except asyncio.CancelledError:
                 pass
+        if cls._queues:
+            try:
+                await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in cls._queues)), drain_timeout)
+            except asyncio.TimeoutError:
+                leftovers = cls._take_queued()
+                logger.warning(f"Dispatcher drain timed out; returning {len(leftovers)} queued messages to the outbox.")
+                await cls._push_back(leftovers)
+        # Workers still mid-send are cancelled; _worker hands their message to the DLQ or outbox
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+        cls._queues = []
         logger.info("Interface Dispatcher Stopped.")
 
     @classmethod
     async def _loop(cls):
+        """Feed outbox messages to the worker that owns their chat."""
         logger.info("Dispatcher Loop Running...")
-        max_retries = 3
-        base_delay = 2.0
 
         while cls._running:
             try:
-                msg = await MQService.pop_outbox()
-
+                # Parks on BRPOP until a message arrives; the timeout only bounds shutdown checks
+                msg = await MQService.pop_outbox_blocking(timeout=1.0)
                 if msg:
-                    handler = cls._send_handlers.get(msg.channel)
-                    if handler:
-                        success = False
-                        last_error = ""
-
-                        for attempt in range(1, max_retries + 1):
-                            try:
-                                await handler(msg)
-                                logger.info(f"Dispatched Outbound: {msg.id} -> {msg.channel.value}")
-                                success = True
-                                break
-                            except Exception as e:
-                                last_error = str(e)
-                                if attempt < max_retries:
-                                    delay = base_delay * (2 ** (attempt - 1))
-                                    logger.warning(
-                                        f"Failed to send message {msg.id} via {msg.channel.value} (Attempt {attempt}/{max_retries}). "
-                                        f"Retrying in {delay}s: {last_error}"
-                                    )
-                                    await asyncio.sleep(delay)
-                                else:
-                                    logger.error(
-                                        f"Failed to send message {msg.id} via {msg.channel.value} after {max_retries} attempts: {last_error}"
-                                    )
-
-                        if not success:
-                            await MQService.push_dlq(msg, error_msg=last_error)
-                    else:
-                        logger.warning(f"No handler registered for channel: {msg.channel.value}")
-                else:
-                    await asyncio.sleep(0.1)
+                    try:
+                        await cls._queue_for(msg).put(msg)
+                    except asyncio.CancelledError:
+                        # Popped from Redis but not queued yet (worker queue was full); don't lose it
+                        await cls._push_back([msg])
+                        raise
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Dispatcher Error: {e}")
                 await asyncio.sleep(1.0)
+
+    @classmethod
+    def _queue_for(cls, msg) -> asyncio.Queue:
+        return cls._queues[hash((msg.channel, msg.channel_id)) % len(cls._queues)]
+
+    @classmethod
+    def _take_queued(cls) -> list:
+        """Empty every worker queue without awaiting, so no worker picks up a message meanwhile."""
+        leftovers = []
+        for queue in cls._queues:
+            while not queue.empty():
+                leftovers.append(queue.get_nowait())
+                queue.task_done()
+        return leftovers
+
+    @classmethod
+    async def _push_back(cls, messages: list):
+        """Return messages the dispatcher took but never sent to the outbox, in their original order."""
+        if not messages:
+            return
+        try:
+            await MQService.push_outbox_many(messages)
+        except Exception as e:
+            logger.error(f"Lost {len(messages)} outbound messages while returning them to the outbox: {e}")
+
+    @classmethod
+    async def _worker(cls, queue: asyncio.Queue):
+        while True:
+            msg = await queue.get()
+            sending = False
+            try:
+                limit = cls._channel_limits.setdefault(msg.channel, asyncio.Semaphore(cls.CHANNEL_CONCURRENCY))
+                async with limit:
+                    sending = True
+                    await cls._deliver(msg)
+            except asyncio.CancelledError:
+                # Shutdown: a send that may have gone out goes to the DLQ rather than risk a duplicate;
+                # one still waiting for its channel slot was never attempted, so it goes back to the outbox
+                if sending:
+                    await MQService.push_dlq(msg, error_msg="Dispatcher stopped during delivery")
+                else:
+                    await cls._push_back([msg])
+                raise
+            except Exception as e:
+                logger.error(f"Dispatcher Error: {e}")
+            finally:
+                queue.task_done()
+
+    @classmethod
+    async def _deliver(cls, msg):
+        """
+        Send one message through its channel handler, then DLQ on failure.
+
+        Transient errors (timeouts, 429, 5xx) are retried with jittered exponential backoff, or
+        after the downstream's Retry-After when it gives one; anything else goes to the DLQ at once.
+        """
+        max_retries = 3
+        base_delay = 2.0
+
+        handler = cls._send_handlers.get(msg.channel)
+        if not handler:
+            logger.warning(f"No handler registered for channel: {msg.channel.value}")
+            return
+
+        last_error = ""
+        for attempt in range(1, max_retries + 1):
+            try:
+                await handler(msg)
+                logger.info("Dispatched Outbound: %s -> %s", msg.id, msg.channel.value)
+                return
+            except Exception as e:
+                last_error = str(e)
+                if not _is_transient(e):
+                    logger.error(
+                        f"Failed to send message {msg.id} via {msg.channel.value} (not retryable): {last_error}"
+                    )
+                    break
+                if attempt < max_retries:
+                    delay = _retry_after(e)
+                    if delay is None:
+                        # Jitter spreads retries out when many sends failed during the same outage
+                        delay = base_delay * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                    logger.warning(
+                        f"Failed to send message {msg.id} via {msg.channel.value} (Attempt {attempt}/{max_retries}). "
+                        f"Retrying in {delay:.1f}s: {last_error}"
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(
+                        f"Failed to send message {msg.id} via {msg.channel.value} after {max_retries} attempts: {last_error}"
+                    )
+
+        await MQService.push_dlq(msg, error_msg=last_error)
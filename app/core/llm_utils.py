@@ -1,10 +1,12 @@
 import asyncio
+import atexit
 import logging
 import os
 import random
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Any
+from urllib.parse import urlsplit
 
 import httpx
 import openai
@@ -15,8 +17,73 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from app.core.config import settings
 from app.core.model_capabilities import lookup_model_capability
 
+try:
+    import h2  # noqa: F401  # httpx needs it for http2=True
+
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+try:
+    from langchain_ollama import OllamaEmbeddings
+except ImportError:
+    OllamaEmbeddings = None
+
 logger = logging.getLogger("nexus.llm_utils")
 _TOKENIZER_FALLBACK_WARNED: set[str] = set()
+# Shared LLM instances per event loop (None outside a loop), since their pooled httpx client is loop-bound
+_LLM_CLIENTS: dict[asyncio.AbstractEventLoop | None, dict[tuple, ChatOpenAI]] = {}
+# Pooled httpx clients shared by every caller with the same proxy settings, so connections stay warm
+_SYNC_HTTP_CLIENTS: dict[tuple, httpx.Client] = {}
+_ASYNC_HTTP_CLIENTS: dict[asyncio.AbstractEventLoop | None, dict[tuple, httpx.AsyncClient]] = {}
+# Shared embedding models per event loop, keyed by the settings snapshot they were built from
+_EMBEDDING_CLIENTS: dict[asyncio.AbstractEventLoop | None, dict[Any, Any]] = {}
+
+
+@dataclass(frozen=True)
+class _ClientEnv:
+    """Connection settings read from the environment once; they do not change for the process lifetime."""
+
+    system_proxy: bool
+    telegram_proxy_url: str | None
+    llm_api_key: str | None
+    llm_base_url: str | None
+    llm_model: str
+    llm_request_timeout: float
+    llm_max_retries: int
+    llm_max_tokens: int | None
+    llm_streaming: bool
+    embedding_base_url: str | None
+    embedding_api_key: str | None
+    embedding_model: str | None
+    embedding_dimension: int
+
+
+def _read_client_env() -> _ClientEnv:
+    return _ClientEnv(
+        system_proxy=bool(os.getenv("HTTP_PROXY") or os.getenv("HTTPS_PROXY")),
+        telegram_proxy_url=os.getenv("TELEGRAM_PROXY_URL"),
+        llm_api_key=os.getenv("LLM_API_KEY"),
+        llm_base_url=os.getenv("LLM_BASE_URL"),
+        llm_model=os.getenv("LLM_MODEL", "gpt-4o"),
+        llm_request_timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "120")),
+        llm_max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+        llm_max_tokens=int(os.getenv("LLM_MAX_TOKENS")) if os.getenv("LLM_MAX_TOKENS") else None,
+        llm_streaming=os.getenv("LLM_STREAMING", "1").lower() not in ("0", "false", "no"),
+        embedding_base_url=os.getenv("EMBEDDING_BASE_URL"),
+        embedding_api_key=os.getenv("EMBEDDING_API_KEY"),
+        embedding_model=os.getenv("EMBEDDING_MODEL"),
+        embedding_dimension=int(os.getenv("EMBEDDING_DIMENSION", "1024")),
+    )
+
+
+_env = _read_client_env()
+
+
+def _refresh_env() -> None:
+    """Re-read the connection settings (tests that change the environment after import)."""
+    global _env
+    _env = _read_client_env()
 
 
 @dataclass
@@ -37,9 +104,14 @@ class EffectiveLLMSettings:
     source: str = "default"
 
 
+_DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+# LLM turns are often more than httpx's default 5s keep-alive apart; hold idle connections longer
+_DEFAULT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+
+
 def get_httpx_timeout() -> httpx.Timeout:
     """Returns a robust timeout for LLM/Embedding calls."""
-    return httpx.Timeout(60.0, connect=10.0)
+    return _DEFAULT_TIMEOUT
 
 
 def _is_rate_limit_error(exc: Exception) -> bool:
@@ -279,38 +351,68 @@ def build_large_output_guidance(messages: list[Any] | None) -> str | None:
     return None
 
 
+_LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "host.docker.internal"})
+
+
+@lru_cache(maxsize=64)
 def is_local_url(url: str) -> bool:
     """Checks if the URL is local (localhost, 127.0.0.1, host.docker.internal)."""
     if not url:
         return False
-    # Simple check for common local domains
-    if "localhost" in url or "127.0.0.1" in url or "host.docker.internal" in url:
-        return True
-    return False
+    # Only a handful of base URLs are ever configured, so the parsed answer is memoized
+    return urlsplit(url if "//" in url else f"//{url}").hostname in _LOCAL_HOSTS
 
 
-def get_httpx_client(event_hooks: dict = None, base_url: str = None) -> httpx.Client:
+@lru_cache(maxsize=64)
+def _proxy_settings(base_url: str | None, env: _ClientEnv) -> tuple[bool, str | None]:
     """
-    Returns a robust sync httpx.Client with standard Nexus configuration.
-    Sets timeout and trust_env based on target URL.
-    """
-    proxy = None
-    trust_env = True
+    Resolve (trust_env, proxy) for a target URL, shared by the sync and async client factories.
 
+    Memoized per base URL and settings snapshot, so the decision is logged once rather than per client request.
+    """
     if base_url and is_local_url(base_url):
         logger.debug(f"Local URL detected ({base_url}). Disabling proxy (trust_env=False).")
-        trust_env = False
-    elif os.getenv("HTTP_PROXY") or os.getenv("HTTPS_PROXY"):
-        logger.debug("Creating httpx.Client with system proxy detected.")
-    elif os.getenv("TELEGRAM_PROXY_URL"):
-        p = os.getenv("TELEGRAM_PROXY_URL")
-        if p.startswith("http://") or p.startswith("https://"):
-            proxy = p
-            logger.info(f"Creating httpx.Client using fallback TELEGRAM_PROXY_URL: {p}")
-        else:
-            logger.warning(f"TELEGRAM_PROXY_URL is set but not used for LLM: {p}")
+        return False, None
+    if env.system_proxy:
+        logger.debug("Using the system proxy for LLM clients (trust_env).")
+        return True, None
+    if env.telegram_proxy_url:
+        p = env.telegram_proxy_url
+        if p.startswith(("http://", "https://")):
+            logger.info(f"LLM clients use fallback TELEGRAM_PROXY_URL: {p}")
+            return True, p
+        logger.warning(f"TELEGRAM_PROXY_URL is set but not used for LLM: {p}")
+    return True, None
+
+
+def _client_options(base_url: str | None) -> dict[str, Any]:
+    trust_env, proxy = _proxy_settings(base_url, _env)
+    # Remote APIs get HTTP/2 so concurrent LLM and embedding calls multiplex over one connection;
+    # local servers (e.g. Ollama) stay on HTTP/1.1
+    http2 = HAS_HTTP2 and not (base_url and is_local_url(base_url))
+    return {
+        "timeout": get_httpx_timeout(),
+        "limits": _DEFAULT_LIMITS,
+        "trust_env": trust_env,
+        "proxy": proxy,
+        "http2": http2,
+    }
+
 
-    return httpx.Client(timeout=get_httpx_timeout(), trust_env=trust_env, proxy=proxy, event_hooks=event_hooks)
+def get_httpx_client(event_hooks: dict = None, base_url: str = None) -> httpx.Client:
+    """
+    Returns a robust sync httpx.Client with standard Nexus configuration.
+    Sets timeout and trust_env based on target URL.
+    """
+    options = _client_options(base_url)
+    if event_hooks:
+        # Hooks are caller-specific, so those clients are not shared
+        return httpx.Client(**options, event_hooks=event_hooks)
+    key = (options["trust_env"], options["proxy"], options["http2"])
+    client = _SYNC_HTTP_CLIENTS.get(key)
+    if client is None or client.is_closed:
+        client = _SYNC_HTTP_CLIENTS[key] = httpx.Client(**options)
+    return client
 
 
 def get_httpx_async_client(event_hooks: dict = None, base_url: str = None) -> httpx.AsyncClient:
@@ -318,21 +420,47 @@ def get_httpx_async_client(event_hooks: dict = None, base_url: str = None) -> ht
     Returns a robust async httpx.AsyncClient with standard Nexus configuration.
     Sets timeout and trust_env based on target URL.
     """
-    proxy = None
-    trust_env = True
-
-    if base_url and is_local_url(base_url):
-        logger.debug(f"Local URL detected ({base_url}). Disabling proxy (trust_env=False).")
-        trust_env = False
-    elif os.getenv("HTTP_PROXY") or os.getenv("HTTPS_PROXY"):
-        pass  # trust_env will handle it
-    elif os.getenv("TELEGRAM_PROXY_URL"):
-        p = os.getenv("TELEGRAM_PROXY_URL")
-        if p.startswith("http://") or p.startswith("https://"):
-            proxy = p
-            logger.info(f"Creating httpx.AsyncClient using fallback TELEGRAM_PROXY_URL: {p}")
-
-    return httpx.AsyncClient(timeout=get_httpx_timeout(), trust_env=trust_env, proxy=proxy, event_hooks=event_hooks)
+    options = _client_options(base_url)
+    if event_hooks:
+        # Hooks are caller-specific, so those clients are not shared
+        return httpx.AsyncClient(**options, event_hooks=event_hooks)
+    clients = _for_running_loop(_ASYNC_HTTP_CLIENTS)
+    key = (options["trust_env"], options["proxy"], options["http2"])
+    client = clients.get(key)
+    if client is None or client.is_closed:
+        client = clients[key] = httpx.AsyncClient(**options)
+    return client
+
+
+def _for_running_loop(cache: dict) -> dict:
+    """The running loop's bucket of a per-loop client cache (None outside a loop)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    clients = cache.get(loop)
+    if clients is None:
+        # Clients of finished loops can no longer be used or closed, so drop them here
+        for stale in [key for key in cache if key is not None and key.is_closed()]:
+            del cache[stale]
+        clients = cache[loop] = {}
+    return clients
+
+
+async def close_llm_clients() -> None:
+    """Close this loop's pooled async HTTP clients and forget the LLM/embedding instances using them (app shutdown)."""
+    loop = asyncio.get_running_loop()
+    _LLM_CLIENTS.pop(loop, None)
+    _EMBEDDING_CLIENTS.pop(loop, None)
+    for client in _ASYNC_HTTP_CLIENTS.pop(loop, {}).values():
+        await client.aclose()
+
+
+@atexit.register
+def _close_sync_http_clients() -> None:
+    for client in _SYNC_HTTP_CLIENTS.values():
+        client.close()
+    _SYNC_HTTP_CLIENTS.clear()
 
 
 def get_llm_client(
@@ -342,58 +470,91 @@ def get_llm_client(
     base_url: str | None = None,
     model_name: str | None = None,
 ) -> ChatOpenAI:
-    """Configures and returns the LLM instance based on environment variables."""
-    api_key = api_key if api_key is not None else os.getenv("LLM_API_KEY")
-    base_url = base_url if base_url is not None else os.getenv("LLM_BASE_URL")
-    model_name = model_name if model_name is not None else os.getenv("LLM_MODEL", "gpt-4o")
+    """
+    Configures and returns the LLM instance based on environment variables.
+
+    Instances are shared per configuration (and per event loop, since the pooled
+    async HTTP client is loop-bound), so repeated callers reuse warm connections.
+    """
+    api_key = api_key if api_key is not None else _env.llm_api_key
+    base_url = base_url if base_url is not None else _env.llm_base_url
+    model_name = model_name if model_name is not None else _env.llm_model
+
+    # Optimized config for GLM-4.7-Flash
+    if "glm-4" in model_name.lower() and "flash" in model_name.lower():
+        temperature = max(temperature, 0.1)
+
+    clients = _for_running_loop(_LLM_CLIENTS)
+    cache_key = (model_name, base_url, api_key, temperature)
+    cached = clients.get(cache_key)
+    if cached is not None:
+        return cached
 
     logger.info(f"Initializing LLM client: base_url={base_url}, model={model_name}, temp={temperature}")
 
     if not api_key:
         logger.warning("LLM_API_KEY is not set.")
 
-    # Optimized config for GLM-4.7-Flash
-    if "glm-4" in model_name.lower() and "flash" in model_name.lower():
-        return ChatOpenAI(
-            model=model_name,
-            api_key=api_key,
-            base_url=base_url,
-            temperature=max(temperature, 0.1),
-            streaming=False,
-        )
-
-    return ChatOpenAI(
+    llm = ChatOpenAI(
         model=model_name,
         api_key=api_key,
         base_url=base_url,
         temperature=temperature,
-        streaming=False,
+        # Streamed responses keep bytes flowing past ~100s gateway idle cutoffs (and feed "thought"
+        # events); ainvoke() callers still get one aggregated message. Usage is requested explicitly
+        # because streamed responses omit it otherwise.
+        streaming=_env.llm_streaming,
+        stream_usage=_env.llm_streaming,
+        # Bounded so a stuck provider cannot hold a worker for the SDK's 10-minute default
+        timeout=_env.llm_request_timeout,
+        max_retries=_env.llm_max_retries,
+        max_tokens=_env.llm_max_tokens,
+        http_client=get_httpx_client(base_url=base_url),
+        http_async_client=get_httpx_async_client(base_url=base_url),
     )
+    clients[cache_key] = llm
+    return llm
 
 
 def get_embeddings_client() -> Any:
     """
     Returns a configured embedding model instance.
     Handles Ollama, Local Server (9292), and OpenAI-compatible providers.
+
+    The instance is shared per event loop, so the memory, router and semantic cache
+    modules all embed through the same pooled connections.
     """
-    base_url = os.getenv("EMBEDDING_BASE_URL") or os.getenv("LLM_BASE_URL")
-    api_key = os.getenv("EMBEDDING_API_KEY") or os.getenv("LLM_API_KEY")
+    clients = _for_running_loop(_EMBEDDING_CLIENTS)
+    embeddings = clients.get(_env)
+    if embeddings is None:
+        embeddings = clients[_env] = _build_embeddings_client()
+    return embeddings
+
+
+def _build_embeddings_client() -> Any:
+    base_url = _env.embedding_base_url or _env.llm_base_url
+    api_key = _env.embedding_api_key or _env.llm_api_key
 
     # Defaults
     default_model = "embedding-3" if base_url and "bigmodel" in base_url else "text-embedding-3-small"
-    model_name = os.getenv("EMBEDDING_MODEL", default_model)
-    dimension = int(os.getenv("EMBEDDING_DIMENSION", "1024"))
+    model_name = _env.embedding_model if _env.embedding_model is not None else default_model
+    dimension = _env.embedding_dimension
 
     logger.info(f"Initializing Embeddings client: base_url='{base_url}', model='{model_name}'")
 
     if not base_url:
         logger.warning("No EMBEDDING_BASE_URL or LLM_BASE_URL found. Falling back to default OpenAI.")
-        return OpenAIEmbeddings(model=model_name, api_key=api_key)
+        return OpenAIEmbeddings(
+            model=model_name,
+            api_key=api_key,
+            http_client=get_httpx_client(),
+            http_async_client=get_httpx_async_client(),
+        )
 
     # Use OllamaEmbeddings for Ollama backend (port 11434)
     if "11434" in base_url:
-        from langchain_ollama import OllamaEmbeddings
-
+        if OllamaEmbeddings is None:
+            raise ImportError("langchain-ollama is required for Ollama embeddings")
         ollama_base = base_url.replace("/v1", "").rstrip("/")
         return OllamaEmbeddings(
             model=model_name.replace(":latest", ""),
@@ -407,6 +568,8 @@ def get_embeddings_client() -> Any:
             api_key=api_key,
             base_url=base_url,
             check_embedding_ctx_length=False,
+            http_client=get_httpx_client(base_url=base_url),
+            http_async_client=get_httpx_async_client(base_url=base_url),
         )
 
     # Default: OpenAI or compatible
@@ -415,4 +578,6 @@ def get_embeddings_client() -> Any:
         api_key=api_key,
         base_url=base_url,
         dimensions=dimension if dimension == 1536 else None,
+        http_client=get_httpx_client(base_url=base_url),
+        http_async_client=get_httpx_async_client(base_url=base_url),
     )
@@ -11,23 +11,40 @@ Global log buffer exported here: `log_buffer`
 import logging
 import os
 import sys
+import time
 from collections import deque
 
-# Global buffer to store recent logs for admin API
+# Global buffer to store recent logs for admin API.
+# Holds raw (created, levelno, name, message) tuples; read it through recent_logs().
 log_buffer = deque(maxlen=2000)
 
 
 class MemoryLogHandler(logging.Handler):
     """Custom handler to store logs in memory deque."""
 
+    def __init__(self, level=logging.INFO):
+        super().__init__(level)
+
     def emit(self, record):
         try:
-            msg = self.format(record)
-            log_buffer.append(msg)
+            msg = record.getMessage()
+            if record.exc_info:
+                # Tracebacks are rare; render them now while the exception is still alive
+                msg = f"{msg}\n{logging.Formatter().formatException(record.exc_info)}"
+            log_buffer.append((record.created, record.levelno, record.name, msg))
         except Exception:
             self.handleError(record)
 
 
+def recent_logs(limit: int) -> list[str]:
+    """Format the last `limit` buffered records; formatting is deferred until someone reads them."""
+    entries = list(log_buffer)[-limit:]
+    return [
+        f"{time.strftime(LOG_DATEFMT, time.localtime(created))} [{name}] {logging.getLevelName(levelno)}: {msg}"
+        for created, levelno, name, msg in entries
+    ]
+
+
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FORMAT = "%(asctime)s [%(name)s] %(levelname)s: %(message)s"
 LOG_DATEFMT = "%H:%M:%S"
@@ -50,7 +67,6 @@ def setup_logging():
 
     # 2. Memory Handler (for Dashboard API)
     mem_handler = MemoryLogHandler()
-    mem_handler.setFormatter(formatter)
     root.addHandler(mem_handler)
 
     root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
@@ -1,15 +1,38 @@
 import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
+import re
+import time
 from contextlib import AsyncExitStack
-from typing import Any, Dict, List, Optional, Type
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
 from urllib.parse import urlparse
 
 # LangChain imports
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, create_model
 
+logger = logging.getLogger("nexus.mcp")
+
+# Tool results are parsed and re-serialized on every MCP call, so use orjson when it is available
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+
 # MCP SDK imports
 try:
     from mcp import ClientSession, StdioServerParameters
@@ -19,21 +42,32 @@ try:
     from mcp.types import CallToolResult
     from mcp.types import Tool as MCPToolModel
 except ImportError:
-    print("WARNING: 'mcp' module not found. MCP features will be disabled.")
+    logger.warning("'mcp' module not found. MCP features will be disabled.")
     ClientSession = Any
     StdioServerParameters = Any
     sse_client = Any
     streamablehttp_client = Any
     MCPToolModel = Any
 
-logger = logging.getLogger("nexus.mcp")
-
 
 # Whitelist of allowed MCP server commands for security
 ALLOWED_MCP_COMMANDS = ["python", "python3", "node", "npx", "uv"]
 
-# Allowlist of allowed hostnames for SSE MCP servers (SSRF protection)
-ALLOWED_SSE_HOSTNAMES = ["localhost", "127.0.0.1", "host.docker.internal", "mcp-homeassistant", "lark-mcp"]
+# Allowlist of allowed hostnames for SSE MCP servers (SSRF protection).
+# _load_from_db() rebuilds it from the base set plus the active plugins' catalog entries on every load.
+_BASE_ALLOWED_SSE_HOSTNAMES = frozenset(
+    {"localhost", "127.0.0.1", "host.docker.internal", "mcp-homeassistant", "lark-mcp"}
+)
+ALLOWED_SSE_HOSTNAMES = set(_BASE_ALLOWED_SSE_HOSTNAMES)
+
+# Looks past leading whitespace for a JSON object/array opener without copying large tool outputs
+_JSON_START_RE = re.compile(r"\s*[\[{]")
+
+# Seconds decrypted plugin secrets are reused before being re-read (writes invalidate them immediately)
+SECRET_CACHE_TTL = 300
+
+# Seconds a server gets to connect and list its tools; override per server with "init_timeout"
+DEFAULT_INIT_TIMEOUT = 30
 
 TOOL_CONFIG_ALIASES = {
     "list_entities": ["query_entities"],
@@ -44,22 +78,90 @@ TOOL_CONFIG_ALIASES = {
 }
 
 
+# JSON-Schema type -> Python annotation; anything else (including "object") stays str
+_JSON_SCHEMA_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool, "array": List[Any]}
+
+
+class _AllowExtraConfig:
+    extra = "allow"
+
+
+@functools.lru_cache(maxsize=256)
+def _create_args_schema(schema_json: str) -> Type[BaseModel]:
+    """
+    Build the pydantic args model for a tool schema.
+
+    Cached on the schema alone, so tools with the same argument shape (e.g. ``{path: str}``) share one
+    model; create_model is slow and schemas are static. The model name is therefore derived from the
+    schema, not the tool; tool names reach the LLM through StructuredTool.name.
+    """
+    schema = json.loads(schema_json)
+    fields = {}
+    required = schema.get("required", [])
+    properties = schema.get("properties", {})
+    for field_name, field_info in properties.items():
+        # Basic type mapping
+        field_type = _JSON_SCHEMA_TYPES.get(field_info.get("type", "string"), str)
+
+        # Extract actual default if provided by the MCP server schema
+        default_val = field_info.get("default", None)
+
+        if field_name in required:
+            fields[field_name] = (field_type, ...)
+        else:
+            fields[field_name] = (Optional[field_type], default_val)
+
+    fields["user_id"] = (Optional[int], None)
+    fields["session_id"] = (Optional[int], None)
+
+    digest = hashlib.blake2b(schema_json.encode(), digest_size=4).hexdigest()
+    model = create_model(f"MCPArgs_{digest}", **fields)
+    if not properties:
+        model.Config = _AllowExtraConfig
+    return model
+
+
 class MCPManager:
-    _instance = None
-    _lock = asyncio.Lock()  # Protect initialization
     _db_plugins: Dict[str, Any] = {}
+    # plugin_id -> (monotonic fetch time, decrypted global secrets)
+    _secret_cache: Dict[int, Tuple[float, Dict[str, str]]] = {}
+    # ((catalog path, mtime_ns), catalog indexed by manifest id)
+    _catalog_cache: Optional[Tuple[Tuple[Path, int], Dict[str, Dict[str, Any]]]] = None
 
     def __init__(self):
-        self.exit_stack = AsyncExitStack()
+        self._lock = asyncio.Lock()  # Protect initialization
+        # Per-server state, keyed by server name; sessions/tools below are the registered view of it
+        self._server_tasks: Dict[str, asyncio.Task] = {}  # one connection-owning task per server
+        self._server_sessions: Dict[str, ClientSession] = {}
+        self._server_tools: Dict[str, List[StructuredTool]] = {}
+        self._server_fingerprints: Dict[str, str] = {}
         self.sessions: Dict[str, ClientSession] = {}  # server_name -> session
         self.tools: List[StructuredTool] = []
         self._initialized = False
+        self._process_env: Dict[str, str] = {}
 
     @classmethod
-    def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = MCPManager()
-        return cls._instance
+    def get_instance(cls) -> "MCPManager":
+        return _mcp_manager
+
+    async def _load_catalog(self) -> Dict[str, Dict[str, Any]]:
+        """plugin_catalog.json indexed by manifest id; re-read off the event loop only when the file changes."""
+        path = Path.cwd() / "plugin_catalog.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+            cached = MCPManager._catalog_cache
+            if cached and cached[0] == (path, mtime):
+                return cached[1]
+            catalog = json.loads(await asyncio.to_thread(path.read_bytes))
+            catalog_dict = {item["id"]: item for item in catalog}
+        except FileNotFoundError:
+            logger.warning("plugin_catalog.json not found")
+            return {}
+        except Exception as e:
+            logger.error(f"Failed to load plugin catalog: {e}")
+            return {}
+        MCPManager._catalog_cache = ((path, mtime), catalog_dict)
+        return catalog_dict
 
     async def _load_from_db(self) -> Optional[Dict[str, Any]]:
         """Fetches enabled plugins from the database."""
@@ -70,26 +172,21 @@ class MCPManager:
             from app.models.plugin import Plugin
 
             # Load catalog manifest
-            catalog_dict = {}
-            try:
-                with open(os.path.join(os.getcwd(), "plugin_catalog.json"), "r") as f:
-                    catalog = json.load(f)
-                    for item in catalog:
-                        catalog_dict[item["id"]] = item
-            except FileNotFoundError:
-                logger.warning("plugin_catalog.json not found")
-            except Exception as e:
-                logger.error(f"Failed to load plugin catalog: {e}")
+            catalog_dict = await self._load_catalog()
 
             async with AsyncSessionLocal() as session:
                 statement = select(Plugin).where(Plugin.status == "active")
                 result = await session.execute(statement)
                 plugins = result.scalars().all()
 
+                allowed_hosts = set(_BASE_ALLOWED_SSE_HOSTNAMES)
                 if not plugins:
+                    ALLOWED_SSE_HOSTNAMES.clear()
+                    ALLOWED_SSE_HOSTNAMES.update(allowed_hosts)
                     return {}
 
                 servers = {}
+                seen_urls = {}
                 for p in plugins:
                     # Merge basic fields with config JSON
                     conf = p.config.copy() if p.config else {}
@@ -109,9 +206,7 @@ class MCPManager:
                             p.source_url = catalog_entry["source_url"]
 
                         # Inject allowed hostnames
-                        for host in catalog_entry.get("allowed_hostnames", []):
-                            if host not in ALLOWED_SSE_HOSTNAMES:
-                                ALLOWED_SSE_HOSTNAMES.append(host)
+                        allowed_hosts.update(catalog_entry.get("allowed_hostnames", ()))
 
                         # Use catalog required_role if present
                         if "required_role" in catalog_entry:
@@ -133,21 +228,22 @@ class MCPManager:
                     # Store plugin ID for secret fetching
                     conf["plugin_id"] = p.id
 
-                    # Ensure name is consistent
-                    servers[p.name] = conf
-
-                # Deduplicate by source_url to prevent double-loading
-                seen_urls = {}
-                for name, conf in list(servers.items()):
+                    # Deduplicate by source_url to prevent double-loading; the first plugin wins
                     url = conf.get("url")
                     if url and url in seen_urls:
                         logger.warning(
-                            f"Duplicate source_url detected: '{name}' conflicts with '{seen_urls[url]}'. Skipping '{name}'."
+                            f"Duplicate source_url detected: '{p.name}' conflicts with '{seen_urls[url]}'. Skipping '{p.name}'."
                         )
-                        del servers[name]
-                    elif url:
-                        seen_urls[url] = name
+                        continue
+                    if url:
+                        seen_urls[url] = p.name
 
+                    # Ensure name is consistent
+                    servers[p.name] = conf
+
+                # Swap in one step so hosts of uninstalled plugins drop out and nothing sees a partial list
+                ALLOWED_SSE_HOSTNAMES.clear()
+                ALLOWED_SSE_HOSTNAMES.update(allowed_hosts)
                 MCPManager._db_plugins = servers
                 return servers
 
@@ -155,8 +251,49 @@ class MCPManager:
             logger.error(f"Failed to load MCP config from DB: {e}")
             return None
 
+    @classmethod
+    def invalidate_secrets(cls, plugin_id: Optional[int]) -> None:
+        """Drop a plugin's cached global secrets; call after writing them so the next (re)load re-reads them."""
+        cls._secret_cache.pop(plugin_id, None)
+
+    def _cached_secrets(self, plugin_id: int) -> Optional[Dict[str, str]]:
+        cached = self._secret_cache.get(plugin_id)
+        if cached and time.monotonic() - cached[0] < SECRET_CACHE_TTL:
+            return cached[1]
+        return None
+
+    async def _prefetch_global_secrets(self, plugin_ids: List[int]) -> None:
+        """Load and decrypt global secrets for every uncached plugin in one query."""
+        missing = {pid for pid in plugin_ids if self._cached_secrets(pid) is None}
+        if not missing:
+            return
+        try:
+            from sqlalchemy import select
+
+            from app.core.db import AsyncSessionLocal
+            from app.core.security import decrypt_secret
+            from app.models.secret import Secret, SecretScope
+
+            async with AsyncSessionLocal() as session:
+                statement = select(Secret).where(
+                    Secret.plugin_id.in_(missing), Secret.scope == SecretScope.global_scope
+                )
+                result = await session.execute(statement)
+                by_plugin: Dict[int, Dict[str, str]] = {pid: {} for pid in missing}
+                for secret in result.scalars().all():
+                    by_plugin[secret.plugin_id][secret.key] = decrypt_secret(secret.encrypted_value)
+        except Exception as e:
+            logger.error(f"Failed to prefetch global secrets for plugins {sorted(missing)}: {e}")
+            return
+        now = time.monotonic()
+        for pid, secrets in by_plugin.items():
+            self._secret_cache[pid] = (now, secrets)
+
     async def _fetch_global_secrets(self, plugin_id: int) -> Dict[str, str]:
         """Fetches and decrypts global secrets for a plugin."""
+        cached = self._cached_secrets(plugin_id)
+        if cached is not None:
+            return cached
         try:
             from sqlalchemy import select
 
@@ -171,10 +308,12 @@ class MCPManager:
                 result = await session.execute(statement)
                 secrets = result.scalars().all()
 
-                return {s.key: decrypt_secret(s.encrypted_value) for s in secrets}
+                decrypted = {s.key: decrypt_secret(s.encrypted_value) for s in secrets}
         except Exception as e:
             logger.error(f"Failed to fetch global secrets for plugin {plugin_id}: {e}")
             return {}
+        self._secret_cache[plugin_id] = (time.monotonic(), decrypted)
+        return decrypted
 
     async def initialize(self):
         """Connects to servers and caches tools."""
@@ -185,110 +324,207 @@ class MCPManager:
             # DB is now the single source of truth for installed plugins
             db_servers = await self._load_from_db()
             servers = db_servers if db_servers else {}
+            await self._start_servers(servers, await self._fingerprints(servers))
+            self._register(servers)
+            self._initialized = True
 
-            for name, server_conf in servers.items():
-                if not server_conf.get("enabled", True):
-                    continue
-                # Fetch global secrets if plugin_id is present
-                global_secrets = {}
-                plugin_id = server_conf.get("plugin_id")
-                if plugin_id:
-                    global_secrets = await self._fetch_global_secrets(plugin_id)
+    async def _fingerprints(self, servers: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Stable hash per server of everything its connection is built from, including plugin secrets."""
+
+        async def fingerprint(server_conf: Dict[str, Any]) -> str:
+            plugin_id = server_conf.get("plugin_id")
+            secrets = await self._fetch_global_secrets(plugin_id) if plugin_id else {}
+            payload = json.dumps({"conf": server_conf, "secrets": secrets}, sort_keys=True, default=str)
+            return hashlib.sha256(payload.encode()).hexdigest()
+
+        # One query for every plugin's secrets; the per-server lookups below and in _connect() then hit the cache
+        await self._prefetch_global_secrets([conf["plugin_id"] for conf in servers.values() if conf.get("plugin_id")])
+        hashes = await asyncio.gather(*(fingerprint(conf) for conf in servers.values()))
+        return dict(zip(servers, hashes))
+
+    async def _start_servers(self, servers: Dict[str, Dict[str, Any]], fingerprints: Dict[str, str]):
+        """Connect the given servers; the caller holds self._lock and calls _register() afterwards."""
+        # Snapshot the process environment once per (re)load; stdio servers without overrides share it
+        self._process_env = dict(os.environ)
+
+        # Servers are independent, so connect them all at once; startup then takes as long as
+        # the slowest server instead of the sum
+        loop = asyncio.get_running_loop()
+        pending = []
+        for name, server_conf in servers.items():
+            ready = loop.create_future()
+            task = asyncio.create_task(self._serve(name, server_conf, ready))
+            self._server_tasks[name] = task
+            self._server_fingerprints[name] = fingerprints[name]
+            timeout = server_conf.get("init_timeout", DEFAULT_INIT_TIMEOUT)
+            pending.append((name, ready, task, timeout, loop.time() + timeout))
+
+        for name, ready, task, timeout, deadline in pending:
+            try:
+                connected = await asyncio.wait_for(ready, max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                # A hanging server must not stall the others; cancelling its task unwinds
+                # whatever it had half-opened
+                logger.error(f"MCP server {name} init exceeded {timeout}s; skipping")
+                task.cancel()
+                continue
+            if connected is None:
+                continue
+            self._server_sessions[name], self._server_tools[name] = connected
+
+    async def _stop_servers(self, names: List[str]):
+        """Close the given servers' connections; the caller holds self._lock."""
+        tasks = [self._server_tasks.pop(name) for name in names if name in self._server_tasks]
+        for name in names:
+            self._server_sessions.pop(name, None)
+            self._server_tools.pop(name, None)
+            self._server_fingerprints.pop(name, None)
+        # Each task closes its own connection as the cancellation unwinds its exit stack
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"MCP server connection closed with error: {result}")
+
+    def _register(self, servers: Dict[str, Dict[str, Any]]):
+        """Expose connected sessions and tools in config order, updating the shared containers in place."""
+        self.sessions.clear()
+        self.sessions.update((name, self._server_sessions[name]) for name in servers if name in self._server_sessions)
+        self.tools[:] = [tool for name in servers for tool in self._server_tools.get(name, [])]
+
+    async def _serve(self, name: str, server_conf: Dict[str, Any], ready: asyncio.Future):
+        """
+        Own one server connection for its whole lifetime.
+
+        The transport contexts (anyio task groups) must be exited by the task that entered them,
+        so each server gets its own task that connects, reports through ``ready`` and then holds
+        the connection open until _stop_servers() cancels it. If the connection dies on its own
+        (subprocess exit, dropped SSE stream) the task ends and forgets the server, so the next
+        reload reconnects it.
+        """
+        try:
+            async with AsyncExitStack() as stack:
+                connected = await self._connect(stack, name, server_conf)
+                if ready.done():  # initialize() gave up on this server
+                    return
+                ready.set_result(connected)
+                if connected is not None:
+                    await asyncio.Future()  # parked until cancelled
+        finally:
+            if not ready.done():
+                ready.set_result(None)
+            if self._server_tasks.get(name) is asyncio.current_task():
+                self._server_sessions.pop(name, None)
+                self._server_tools.pop(name, None)
+                self._server_fingerprints.pop(name, None)
+
+    async def _connect(
+        self, stack: AsyncExitStack, name: str, server_conf: Dict[str, Any]
+    ) -> Optional[Tuple[ClientSession, List[StructuredTool]]]:
+        """Connect to one server and convert its tools; returns None when it is skipped or fails."""
+        if not server_conf.get("enabled", True):
+            return None
+        # Fetch global secrets if plugin_id is present
+        global_secrets = {}
+        plugin_id = server_conf.get("plugin_id")
+        if plugin_id:
+            global_secrets = await self._fetch_global_secrets(plugin_id)
 
+        try:
+            command = server_conf.get("command")
+            args = server_conf.get("args", [])
+            env = server_conf.get("env", None)
+            required_role = server_conf.get("required_role", "user")
+            allowed_groups = server_conf.get("allowed_groups")
+
+            # Check for SSE (URL) configuration first
+            url = server_conf.get("url")
+
+            read, write = None, None
+
+            if url:
+                # SSRF protection: validate hostname against allowlist
+                parsed_url = urlparse(url)
+                hostname = parsed_url.hostname
+                if hostname not in ALLOWED_SSE_HOSTNAMES:
+                    logger.warning(
+                        f"SSRF protection: Skipping MCP server '{name}' with disallowed hostname '{hostname}'. "
+                        f"Allowed hostnames: {sorted(ALLOWED_SSE_HOSTNAMES)}"
+                    )
+                    return None
+
+                transport = "streamable_http" if parsed_url.path.rstrip("/") == "/mcp" else "sse"
+                remote_headers = dict(global_secrets)
+                if parsed_url.hostname and "Host" not in remote_headers:
+                    remote_headers["Host"] = parsed_url.hostname
+                logger.info(f"Connecting to Remote MCP: {name} ({url}) via {transport} [Role: {required_role}]...")
                 try:
-                    command = server_conf.get("command")
-                    args = server_conf.get("args", [])
-                    env = server_conf.get("env", None)
-                    required_role = server_conf.get("required_role", "user")
-                    allowed_groups = server_conf.get("allowed_groups")
-
-                    # Check for SSE (URL) configuration first
-                    url = server_conf.get("url")
-
-                    read, write = None, None
-
-                    if url:
-                        # SSRF protection: validate hostname against allowlist
-                        parsed_url = urlparse(url)
-                        hostname = parsed_url.hostname
-                        if hostname not in ALLOWED_SSE_HOSTNAMES:
-                            logger.warning(
-                                f"SSRF protection: Skipping MCP server '{name}' with disallowed hostname '{hostname}'. "
-                                f"Allowed hostnames: {ALLOWED_SSE_HOSTNAMES}"
-                            )
-                            continue
-
-                        transport = "streamable_http" if parsed_url.path.rstrip("/") == "/mcp" else "sse"
-                        remote_headers = dict(global_secrets)
-                        if parsed_url.hostname and "Host" not in remote_headers:
-                            remote_headers["Host"] = parsed_url.hostname
-                        logger.info(
-                            f"Connecting to Remote MCP: {name} ({url}) via {transport} [Role: {required_role}]..."
+                    if transport == "streamable_http":
+                        read, write, _ = await stack.enter_async_context(
+                            streamablehttp_client(url, headers=remote_headers)
                         )
-                        try:
-                            if transport == "streamable_http":
-                                read, write, _ = await self.exit_stack.enter_async_context(
-                                    streamablehttp_client(url, headers=remote_headers)
-                                )
-                            else:
-                                read, write = await self.exit_stack.enter_async_context(
-                                    sse_client(url, headers=remote_headers)
-                                )
-                        except Exception as e:
-                            logger.error(f"Failed to connect to Remote MCP {name} via {transport}: {e}")
-                            continue
-
-                    elif command:
-                        # Security check: validate command against whitelist
-                        if command not in ALLOWED_MCP_COMMANDS:
-                            logger.critical(
-                                f"SECURITY ALERT: MCP server '{name}' uses forbidden command '{command}'. "
-                                f"Allowed commands: {ALLOWED_MCP_COMMANDS}. Skipping server."
-                            )
-                            continue
-
-                        logger.info(f"Connecting to Local MCP: {name} ({command} {args}) [Role: {required_role}]...")
-                        try:
-                            server_params = StdioServerParameters(
-                                command=command, args=args, env={**os.environ, **(env or {}), **global_secrets}
-                            )
-                            read, write = await self.exit_stack.enter_async_context(stdio_client(server_params))
-                        except Exception as e:
-                            logger.error(f"Failed to connect to Stdio MCP {name}: {e}")
-                            continue
-
-                    if not read or not write:
-                        continue
-
-                    # Create session (Common for both Stdio and SSE)
-                    session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-                    await session.initialize()
-                    self.sessions[name] = session
-
-                    # Fetch available tools
-                    mcp_tools_response = await session.list_tools()
-                    server_tool_config = server_conf.get("tool_config", {})
-                    context_tags = server_conf.get("context_tags", ["standard"])
-
-                    for tool in mcp_tools_response.tools:
-                        lc_tool = self._convert_to_langchain_tool(
-                            name,
-                            session,
-                            tool,
-                            required_role,
-                            server_tool_config,
-                            plugin_id,
-                            allowed_groups,
-                            context_tags,
-                        )
-                        self.tools.append(lc_tool)
-
-                    logger.info(f"Connected to {name}. Loaded {len(mcp_tools_response.tools)} tools.")
-
+                    else:
+                        read, write = await stack.enter_async_context(sse_client(url, headers=remote_headers))
+                except Exception as e:
+                    logger.error(f"Failed to connect to Remote MCP {name} via {transport}: {e}")
+                    return None
+
+            elif command:
+                # Security check: validate command against whitelist
+                if command not in ALLOWED_MCP_COMMANDS:
+                    logger.critical(
+                        f"SECURITY ALERT: MCP server '{name}' uses forbidden command '{command}'. "
+                        f"Allowed commands: {ALLOWED_MCP_COMMANDS}. Skipping server."
+                    )
+                    return None
+
+                logger.info(f"Connecting to Local MCP: {name} ({command} {args}) [Role: {required_role}]...")
+                try:
+                    overrides = {**(env or {}), **global_secrets}
+                    server_env = {**self._process_env, **overrides} if overrides else self._process_env
+                    server_params = StdioServerParameters(command=command, args=args, env=server_env)
+                    read, write = await stack.enter_async_context(stdio_client(server_params))
                 except Exception as e:
-                    logger.error(f"Failed to connect to MCP server {name}: {e}")
+                    logger.error(f"Failed to connect to Stdio MCP {name}: {e}")
+                    return None
+
+            if not read or not write:
+                return None
+
+            # Create session (Common for both Stdio and SSE)
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+
+            # Fetch available tools
+            mcp_tools_response = await session.list_tools()
+            server_tool_config = server_conf.get("tool_config", {})
+            context_tags = server_conf.get("context_tags", ["standard"])
+
+            def convert_tools() -> List[StructuredTool]:
+                return [
+                    self._convert_to_langchain_tool(
+                        name,
+                        session,
+                        tool,
+                        required_role,
+                        server_tool_config,
+                        plugin_id,
+                        allowed_groups,
+                        context_tags,
+                    )
+                    for tool in mcp_tools_response.tools
+                ]
+
+            # Schema cleaning and pydantic model building are CPU work; keep them off the event loop
+            # so the other servers' handshakes are not stalled behind them
+            tools = await asyncio.to_thread(convert_tools)
+
+            logger.info("Connected to %s. Loaded %d tools.", name, len(tools))
+            return session, tools
 
-            self._initialized = True
+        except Exception as e:
+            logger.error(f"Failed to connect to MCP server {name}: {e}")
+            return None
 
     def _convert_to_langchain_tool(
         self,
@@ -315,6 +551,31 @@ class MCPManager:
 
             return {}
 
+        async def original_mcp_call(**k):
+            try:
+                result: CallToolResult = await session.call_tool(tool.name, arguments=k)
+                texts = [c.text for c in result.content if c.type == "text"]
+                raw_text = "\n".join(texts)
+                json_content = None
+                if _JSON_START_RE.match(raw_text):
+                    try:
+                        json_content = _json_loads(raw_text)
+                    except Exception:
+                        pass
+                wrapper = (
+                    {"type": "json", "content": json_content}
+                    if json_content is not None
+                    else {"type": "text", "content": raw_text}
+                )
+                return _json_dumps(wrapper)
+            except Exception as e:
+                return _json_dumps({"type": "error", "message": str(e)})
+
+        # The server's tool config is fixed for the connection's lifetime, so resolve it once here
+        tool_conf = resolve_tool_config(tool.name)
+        if plugin_id:
+            tool_conf["plugin_id"] = plugin_id
+
         async def _arun(**kwargs) -> str:
             try:
                 from app.core.mcp_middleware import MCPMiddleware
@@ -324,29 +585,6 @@ class MCPManager:
                     if internal_key in kwargs:
                         internal_args[internal_key] = kwargs.pop(internal_key)
 
-                async def original_mcp_call(**k):
-                    try:
-                        result: CallToolResult = await session.call_tool(tool.name, arguments=k)
-                        texts = [c.text for c in result.content if c.type == "text"]
-                        raw_text = "\n".join(texts)
-                        json_content = None
-                        if raw_text.strip().startswith(("{", "[")):
-                            try:
-                                json_content = json.loads(raw_text)
-                            except Exception:
-                                pass
-                        wrapper = (
-                            {"type": "json", "content": json_content}
-                            if json_content is not None
-                            else {"type": "text", "content": raw_text}
-                        )
-                        return json.dumps(wrapper, ensure_ascii=False)
-                    except Exception as e:
-                        return json.dumps({"type": "error", "message": str(e)}, ensure_ascii=False)
-
-                tool_conf = resolve_tool_config(tool.name)
-                if plugin_id:
-                    tool_conf["plugin_id"] = plugin_id
                 return await MCPMiddleware.call_tool(
                     tool_name=tool.name,
                     args={**kwargs, **internal_args},
@@ -360,7 +598,7 @@ class MCPManager:
         from app.core.schema_utils import clean_schema
 
         cleaned_schema = clean_schema(tool.inputSchema)
-        args_schema = self._create_args_schema(tool.name, cleaned_schema)
+        args_schema = _create_args_schema(json.dumps(cleaned_schema, sort_keys=True))
 
         return StructuredTool.from_function(
             coroutine=_arun,
@@ -376,47 +614,6 @@ class MCPManager:
             },
         )
 
-    def _create_args_schema(self, tool_name: str, schema: Dict[str, Any]) -> Type[BaseModel]:
-        fields = {}
-        required = schema.get("required", [])
-        properties = schema.get("properties", {})
-        for field_name, field_info in properties.items():
-            t = field_info.get("type", "string")
-
-            # Basic type mapping
-            field_type = str
-            if t == "integer":
-                field_type = int
-            elif t == "number":
-                field_type = float
-            elif t == "boolean":
-                field_type = bool
-            elif t == "array":
-                field_type = List[Any]
-
-            # Extract actual default if provided by the MCP server schema
-            default_val = field_info.get("default", None)
-
-            if field_name in required:
-                fields[field_name] = (field_type, ...)
-            else:
-                fields[field_name] = (Optional[field_type], default_val)
-
-        fields["user_id"] = (Optional[int], None)
-        fields["session_id"] = (Optional[int], None)
-
-        model_config = None
-        if not properties:
-
-            class Config:
-                extra = "allow"
-
-            model_config = Config
-        model = create_model(f"{tool_name}Schema", **fields)
-        if model_config:
-            model.Config = model_config
-        return model
-
     def get_tools(self) -> List[StructuredTool]:
         return self.tools
 
@@ -432,7 +629,7 @@ class MCPManager:
         return "\n\n".join(instructions)
 
     async def reload(self):
-        """Hot-swaps MCP servers by cleaning up and re-initializing."""
+        """Hot-swaps MCP servers, reconnecting only the ones whose config or secrets changed."""
         logger.info("Reloading MCP servers from DB/Config...")
 
         # Handle connection errors gracefully by checking DB before cleanup
@@ -441,24 +638,34 @@ class MCPManager:
             logger.error("Failed to connect to DB during reload. Keeping existing sessions.")
             return
 
-        await self.cleanup()
-        await self.initialize()
+        async with self._lock:
+            fingerprints = await self._fingerprints(db_servers)
+            # Keep live connections whose inputs are unchanged; anything else (changed, removed,
+            # previously failed, died since) is closed, and every server not kept is (re)connected
+            keep = {
+                name
+                for name in self._server_sessions
+                if name in self._server_tasks
+                and not self._server_tasks[name].done()
+                and fingerprints.get(name) == self._server_fingerprints.get(name)
+            }
+            await self._stop_servers([name for name in self._server_tasks if name not in keep])
+            changed = {name: conf for name, conf in db_servers.items() if name not in keep}
+            await self._start_servers(changed, fingerprints)
+            self._register(db_servers)
+            self._initialized = True
+            logger.info("MCP reload: kept %d server(s), reconnected %d.", len(keep), len(changed))
 
     async def cleanup(self):
         async with self._lock:
-            old_exit_stack = self.exit_stack
-            self.exit_stack = AsyncExitStack()
+            await self._stop_servers(list(self._server_tasks))
             self.sessions.clear()
             self.tools.clear()
             self._initialized = False
-            try:
-                await old_exit_stack.aclose()
-            except RuntimeError as e:
-                logger.warning(f"MCP cleanup skipped stack close due to task-bound context issue: {e}")
 
 
 # Global accessor
-_mcp_manager = MCPManager.get_instance()
+_mcp_manager = MCPManager()
 
 
 async def get_mcp_tools() -> List[StructuredTool]:
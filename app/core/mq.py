@@ -4,7 +4,7 @@ import os
 import time
 import uuid
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import redis.asyncio as redis
 from pydantic import BaseModel, Field
@@ -102,7 +102,7 @@ class MQService:
         try:
             # LPUSH: Add to head
             await r.lpush(cls.INBOX_KEY, message.model_dump_json())
-            logger.debug(f"MQ INBOX Push: {message.id} ({message.channel})")
+            logger.debug("MQ INBOX Push: %s (%s)", message.id, message.channel)
         except Exception as e:
             logger.error(f"Failed to push to INBOX: {e}")
             raise
@@ -126,7 +126,20 @@ class MQService:
         r = await cls.get_redis()
         try:
             await r.lpush(cls.OUTBOX_KEY, message.model_dump_json())
-            logger.debug(f"MQ OUTBOX Push: {message.id} ({message.channel})")
+            logger.debug("MQ OUTBOX Push: %s (%s)", message.id, message.channel)
+        except Exception as e:
+            logger.error(f"Failed to push to OUTBOX: {e}")
+            raise
+
+    @classmethod
+    async def push_outbox_many(cls, messages: List[UnifiedMessage]):
+        """Push several messages to the Outbox with a single LPUSH (consumers still see them in order)."""
+        if not messages:
+            return
+        r = await cls.get_redis()
+        try:
+            await r.lpush(cls.OUTBOX_KEY, *(message.model_dump_json() for message in messages))
+            logger.debug("MQ OUTBOX Push: %d messages", len(messages))
         except Exception as e:
             logger.error(f"Failed to push to OUTBOX: {e}")
             raise
@@ -153,3 +166,16 @@ class MQService:
         except Exception as e:
             logger.error(f"Failed to pop from OUTBOX: {e}")
         return None
+
+    @classmethod
+    async def pop_outbox_blocking(cls, timeout: float = 1.0) -> Optional[UnifiedMessage]:
+        """Wait up to ``timeout`` seconds for an Outbox message (BRPOP) instead of polling."""
+        r = await cls.get_redis()
+        try:
+            item = await r.brpop(cls.OUTBOX_KEY, timeout=timeout)
+            if item:
+                return UnifiedMessage.model_validate_json(item[1])
+        except Exception as e:
+            logger.error(f"Failed to pop from OUTBOX: {e}")
+            raise
+        return None
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+import numpy as np
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """
+    In-memory semantic cache for tool-free LLM replies.
+
+    A cached reply is only reused when the conversation context (system prompt,
+    earlier history, bound tools and user) hashes identically and the new user
+    message embeds within ``threshold`` cosine similarity of the cached one.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float | None = None,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        embeddings: Any = None,
+    ):
+        self.threshold = threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries if max_entries is not None else settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.SEMANTIC_CACHE_TTL_SECONDS
+        self._embeddings = embeddings
+        # context_key -> list of (unit vector, reply content, stored_at); ordered for LRU eviction
+        self._entries: "OrderedDict[str, list[tuple[np.ndarray, str, float]]]" = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def context_key(user: Any, messages: list[BaseMessage], tool_names: list[str]) -> str | None:
+        """
+        Hash everything except the final user message.
+
+        Returns None when the turn is not cacheable (the conversation does not end
+        with a user message, e.g. a follow-up after tool results).
+        """
+        history = [m for m in messages if not isinstance(m, SystemMessage)]
+        if not history or not isinstance(history[-1], HumanMessage):
+            return None
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(getattr(user, "id", None)).encode())
+        for name in sorted(tool_names):
+            digest.update(b"\x00tool:" + name.encode())
+        for msg in messages:
+            if msg is history[-1]:
+                continue
+            digest.update(b"\x00" + msg.type.encode() + b":" + str(msg.content).encode())
+        return digest.hexdigest()
+
+    def _get_embeddings(self):
+        if self._embeddings is None:
+            from app.core.llm_utils import get_embeddings_client
+
+            self._embeddings = get_embeddings_client()
+        return self._embeddings
+
+    async def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self._get_embeddings().aembed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _lookup(self, vector: np.ndarray, context_key: str) -> Optional[str]:
+        entries = self._entries.get(context_key)
+        if not entries:
+            return None
+
+        now = time.monotonic()
+        live = [entry for entry in entries if now - entry[2] < self.ttl_seconds]
+        self._size -= len(entries) - len(live)
+        if not live:
+            del self._entries[context_key]
+            return None
+        self._entries[context_key] = live
+        self._entries.move_to_end(context_key)
+
+        scores = np.stack([entry[0] for entry in live]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            return live[best][1]
+        return None
+
+    def _store(self, vector: np.ndarray, context_key: str, content: str) -> None:
+        self._entries.setdefault(context_key, []).append((vector, content, time.monotonic()))
+        self._entries.move_to_end(context_key)
+        self._size += 1
+        while self._size > self.max_entries and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def get_or_call(
+        self,
+        query: str,
+        context_key: str,
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return a cached reply for ``query`` or invoke ``call`` and cache a tool-free result."""
+        try:
+            vector = await self._embed(query)
+        except Exception as e:
+            logger.warning("Semantic cache embedding failed, calling LLM directly: %s", e)
+            return await call()
+
+        cached = self._lookup(vector, context_key)
+        if cached is not None:
+            logger.info("Semantic cache hit (context=%s)", context_key[:8])
+            return AIMessage(content=cached, response_metadata={"semantic_cache": "hit"})
+
+        response = await call()
+        content = getattr(response, "content", None)
+        if isinstance(content, str) and content and not getattr(response, "tool_calls", None):
+            self._store(vector, context_key, content)
+        return response
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+semantic_cache = SemanticResponseCache()
@@ -16,6 +16,7 @@ class AgentState(TypedDict):
     user: Optional[User]
     trace_id: uuid.UUID
     memories: Optional[List[str]]  # Retrieved memories for context injection
+    last_user_content: Optional[str]  # Incoming user message for this run, set at ingest time
     session_id: Optional[int]  # Current persistent session ID
     context: str = "home"  # Default context (home/work)
     intent_class: Optional[str] = None  # Fast intent gate classification
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import weakref
 from typing import Any, Literal, TypedDict
 
 CAPABILITY_DOMAINS = {
@@ -67,6 +68,11 @@ DEFAULT_TOOL_METADATA: ToolCapabilityMetadata = {
     "required_role": "user",
 }
 
+READ_ONLY_OPERATION_KINDS = frozenset({"discover", "read", "verify"})
+
+# id(tool) -> (weakref to tool, raw metadata object it was built from, normalized metadata)
+_TOOL_METADATA_CACHE: dict[int, tuple[weakref.ref, Any, ToolCapabilityMetadata]] = {}
+
 
 def _infer_capability_domain(tool_name: str, metadata: dict[str, Any]) -> str:
     domain = str(
@@ -186,8 +192,37 @@ def build_tool_metadata(tool_name: str, metadata: dict[str, Any] | None = None)
 
 
 def get_tool_metadata(tool: Any) -> ToolCapabilityMetadata:
-    """Read metadata from a LangChain tool-like object and normalize it."""
+    """
+    Read metadata from a LangChain tool-like object and normalize it.
+
+    The normalized contract is memoized per tool object and recomputed only when
+    ``tool.metadata`` is reassigned, so callers must treat the result as read-only.
+    """
+
+    raw_metadata = getattr(tool, "metadata", None)
+    key = id(tool)
+    cached = _TOOL_METADATA_CACHE.get(key)
+    if cached is not None and cached[0]() is tool and cached[1] is raw_metadata:
+        return cached[2]
 
-    raw_metadata = getattr(tool, "metadata", None) or {}
     tool_name = getattr(tool, "name", "unknown_tool")
-    return build_tool_metadata(tool_name, raw_metadata)
+    normalized = build_tool_metadata(tool_name, raw_metadata or {})
+    try:
+        ref = weakref.ref(tool, lambda _ref, key=key: _TOOL_METADATA_CACHE.pop(key, None))
+    except TypeError:
+        return normalized
+    _TOOL_METADATA_CACHE[key] = (ref, raw_metadata, normalized)
+    return normalized
+
+
+def declares_read_only(tool: Any) -> bool:
+    """
+    Whether the tool's own metadata explicitly declares a read-only operation.
+
+    Unlike ``get_tool_metadata`` this ignores name-based inference (which defaults
+    unknown tools to "read"), so MCP tools without a declared kind are never treated as safe.
+    """
+
+    raw_metadata = getattr(tool, "metadata", None) or {}
+    operation_kind = str(raw_metadata.get("operation_kind") or "").lower()
+    return operation_kind in READ_ONLY_OPERATION_KINDS and not raw_metadata.get("side_effect")
@@ -24,6 +24,7 @@ class AgentWorker:
     _task = None
     _agent_graph = None
     _tools = []
+    _tool_index = None
 
     @classmethod
     def set_agent_graph(cls, graph):
@@ -32,6 +33,14 @@ class AgentWorker:
     @classmethod
     def set_tools(cls, tools: list):
         cls._tools = tools
+        cls.refresh_tool_index()
+
+    @classmethod
+    def refresh_tool_index(cls):
+        """Rebuild the permission index for the catalog (after set_tools or when tool metadata changes)."""
+        from app.core.auth_service import build_tool_domain_index
+
+        cls._tool_index = build_tool_domain_index(cls._tools)
 
     @classmethod
     def get_tools(cls) -> list:
@@ -166,7 +175,7 @@ class AgentWorker:
     @classmethod
     async def _process_message(cls, msg: UnifiedMessage):
         """Process a message through the Agent with live updates."""
-        logger.info(f"Processing Message: {msg.id} [{msg.content}]")
+        logger.info("Processing Message: %s [%s]", msg.id, msg.content)
 
         # 0. Intercept Binding Command
         # /bind 123456, bind 123456, or 绑定 123456
@@ -220,7 +229,7 @@ class AgentWorker:
                         async with AsyncSessionLocal() as session:
                             u = await session.get(User, target_user_id)
                             if u:
-                                allowed_tools = AuthService.get_allowed_tools(u, cls._tools)
+                                allowed_tools = AuthService.get_allowed_tools(u, cls._tools, cls._tool_index)
                                 # Map to commands
                                 commands = []
                                 for t in allowed_tools:
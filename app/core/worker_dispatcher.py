@@ -4,6 +4,7 @@ from typing import Any, Literal, TypedDict
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 
+from app.core.i18n import detect_language
 from app.core.state import AgentState
 from app.core.tool_catalog import ToolCatalog
 from app.core.trace_logger import trace_logger
@@ -91,7 +92,7 @@ class WorkerDispatcher:
         for msg in reversed(messages or []):
             if isinstance(msg, HumanMessage):
                 content = str(msg.content or "")
-                return any("\u4e00" <= ch <= "\u9fff" for ch in content)
+                return detect_language(content) == "zh"
         return False
 
     @staticmethod
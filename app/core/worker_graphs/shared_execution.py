@@ -5,7 +5,7 @@ from typing import Any, TypedDict
 
 from langchain_core.messages import ToolMessage
 
-from app.core.audit import AuditInterceptor
+from app.core.audit import AuditInterceptor, PolicyDeniedError
 from app.core.auth_service import AuthService
 from app.core.result_classifier import ResultClassification, ResultClassifier
 from app.core.state import AgentState
@@ -61,6 +61,16 @@ def _unwrap_optional_annotation(annotation):
     return annotation
 
 
+def _accepts_arg(schema: Any, name: str) -> bool:
+    """Whether a tool's args schema declares ``name``; tools without a schema get context args as before."""
+    if schema is None:
+        return True
+    if isinstance(schema, dict):
+        return name in schema.get("properties", {})
+    fields = getattr(schema, "model_fields", None)
+    return fields is None or name in fields
+
+
 def _strip_none_values(value: Any) -> Any:
     """Recursively drop explicit nulls before MCP schema validation."""
     if isinstance(value, dict):
@@ -138,12 +148,12 @@ async def execute_tool_call_generic(
     try:
         tool_args = _strip_none_values(dict(tool_args or {}))
 
-        if user:
+        schema = getattr(tool_to_call, "args_schema", None)
+        if user and _accepts_arg(schema, "user_id"):
             tool_args["user_id"] = user.id
-        if state.get("session_id") is not None:
+        if state.get("session_id") is not None and _accepts_arg(schema, "session_id"):
             tool_args["session_id"] = state.get("session_id")
 
-        schema = getattr(tool_to_call, "args_schema", None)
         if schema:
             for field_name, field_info in schema.model_fields.items():
                 if field_name in tool_args and tool_args[field_name] is None:
@@ -180,6 +190,23 @@ async def execute_tool_call_generic(
             fingerprint=fingerprint,
             metadata=metadata,
         )
+    except PolicyDeniedError as exc:
+        # PolicyMatrix blocked the call; report it as a permission denial so the classifier
+        # does not treat it as a retryable failure. A PermissionError raised by the tool
+        # itself (e.g. a filesystem error) falls through to the generic handler below.
+        logger.info("Tool '%s' blocked by policy: %s", tool_name, exc)
+        result_str = f"Error: Permission denied. {exc}"
+        outcome = ToolExecutionOutcome(
+            tool_name=tool_name,
+            worker=worker,
+            status="error",
+            raw_text=result_str,
+            structured_data=None,
+            exception_text=result_str,
+            latency_ms=0,
+            fingerprint=fingerprint,
+            metadata=metadata,
+        )
     except Exception as exc:
         error_text = str(exc)
         is_internal_error = any(
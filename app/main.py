@@ -123,6 +123,9 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown logic
+    from app.core.auth_service import AuthService
+    from app.core.designer import MemSkillDesigner
+    from app.core.llm_utils import close_llm_clients
     from app.core.mcp_manager import stop_mcp
     from app.core.scheduler import SchedulerService
 
@@ -131,6 +134,14 @@ async def lifespan(app: FastAPI):
     await AgentWorker.stop()
     await InterfaceDispatcher.stop()
     await stop_mcp()
+    # Stop the periodic flusher first so it cannot race the final flush.
+    await MemSkillDesigner.stop_feedback_flusher()
+    try:
+        await MemSkillDesigner.flush_feedback()
+    except Exception as e:
+        logger.error(f"Failed to flush skill feedback on shutdown: {e}")
+    await AuthService.close()
+    await close_llm_clients()
 
 
 app = FastAPI(
@@ -311,7 +322,12 @@ async def voice_chat(file: UploadFile = File(...), current_user: User = Depends(
     user_message = HumanMessage(content=transcribed_text)
     trace_id = uuid.uuid4()
 
-    initial_state = {"messages": [user_message], "user": current_user, "trace_id": trace_id}
+    initial_state = {
+        "messages": [user_message],
+        "user": current_user,
+        "trace_id": trace_id,
+        "last_user_content": transcribed_text,
+    }
 
     final_state = await agent_graph.ainvoke(initial_state)
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import JSON, Column, ForeignKey, Integer
+from sqlalchemy import JSON, Column, ForeignKey, Integer, UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -27,6 +27,12 @@ class User(SQLModel, table=True):
 
 class UserIdentity(SQLModel, table=True):
     __tablename__ = "user_identities"
+    # One social ID -> one user; one identity per provider per user. The (user_id, provider)
+    # constraint also serves user_id lookups through its leading column.
+    __table_args__ = (
+        UniqueConstraint("provider", "provider_user_id", name="uq_identity_provider"),
+        UniqueConstraint("user_id", "provider", name="uq_identity_user_provider"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     # user_id: int = Field(foreign_key="user.id")
@@ -30,15 +30,16 @@ async def list_available_tools(category: Optional[str] = None, user_id: int = No
 
     # Group by category
     tool_map = {}
+    is_permitted = AuthService.permission_checker(current_user) if current_user else None
     for t in tools:
         # Permission Check
-        if current_user:
+        if is_permitted:
             # Infer domain/tag if available, else standard
             domain = "standard"
             if hasattr(t, "metadata") and t.metadata:
                 domain = t.metadata.get("domain", "standard")
 
-            if not AuthService.check_tool_permission(current_user, t.name, domain):
+            if not is_permitted(t.name, domain):
                 continue
 
         cat = "Core/Internal"
@@ -29,6 +29,97 @@ class TestAgentGraph:
         graph = create_agent_graph(tools)
         assert graph is not None
 
+    async def test_read_only_tool_calls_run_concurrently(self, mocker):
+        """Declared read-only tool calls in one turn overlap; acting tools keep their order."""
+        import asyncio
+
+        from langchain_core.tools import tool
+
+        @tool
+        def get_weather(city: str) -> str:
+            """Get weather."""
+            return city
+
+        @tool
+        def get_news(topic: str) -> str:
+            """Get news."""
+            return topic
+
+        @tool
+        def restart_heater(zone: str) -> str:
+            """Restart heater."""
+            return zone
+
+        get_weather.metadata = {"operation_kind": "read"}
+        get_news.metadata = {"operation_kind": "discover"}
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_execute(state, *, tool_name, tool_call_id, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"message": ToolMessage(content=tool_name, name=tool_name, tool_call_id=tool_call_id)}
+
+        mocker.patch("app.core.agent.WorkerDispatcher.execute_tool_call", side_effect=fake_execute)
+        tool_node = create_agent_graph([get_weather, get_news, restart_heater]).nodes["tools"].bound.afunc
+
+        read_calls = [
+            {"name": "get_weather", "args": {"city": "Oslo"}, "id": "1"},
+            {"name": "get_news", "args": {"topic": "ai"}, "id": "2"},
+        ]
+        result = await tool_node({"messages": [AIMessage(content="", tool_calls=read_calls)]})
+        assert [m.content for m in result["messages"]] == ["get_weather", "get_news"]
+        assert peak == 2
+
+        peak = 0
+        mixed_calls = read_calls + [{"name": "restart_heater", "args": {"zone": "a"}, "id": "3"}]
+        result = await tool_node({"messages": [AIMessage(content="", tool_calls=mixed_calls)]})
+        assert [m.content for m in result["messages"]] == ["get_weather", "get_news", "restart_heater"]
+        assert peak == 1
+
+    async def test_undeclared_mcp_tool_calls_run_sequentially(self, mocker):
+        """MCP tools without a declared read-only operation never run concurrently."""
+        import asyncio
+
+        from langchain_core.tools import StructuredTool
+
+        def _mcp_tool(name):
+            return StructuredTool.from_function(
+                coroutine=lambda entity_id: asyncio.sleep(0, result=entity_id),
+                name=name,
+                description=name,
+                metadata={"source": "mcp", "server": "homeassistant"},
+            )
+
+        order = []
+        in_flight = 0
+        peak = 0
+
+        async def fake_execute(state, *, tool_name, tool_call_id, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            order.append(tool_name)
+            in_flight -= 1
+            return {"message": ToolMessage(content=tool_name, name=tool_name, tool_call_id=tool_call_id)}
+
+        mocker.patch("app.core.agent.WorkerDispatcher.execute_tool_call", side_effect=fake_execute)
+        tools = [_mcp_tool("HassTurnOff"), _mcp_tool("HassTurnOn")]
+        tool_node = create_agent_graph(tools).nodes["tools"].bound.afunc
+
+        calls = [
+            {"name": "HassTurnOff", "args": {"entity_id": "light.desk"}, "id": "1"},
+            {"name": "HassTurnOn", "args": {"entity_id": "light.desk"}, "id": "2"},
+        ]
+        await tool_node({"messages": [AIMessage(content="", tool_calls=calls)]})
+        assert order == ["HassTurnOff", "HassTurnOn"]
+        assert peak == 1
+
     async def test_agent_processes_message(self, mock_llm, test_user: User):
         """Agent should process user messages."""
         tools = []
@@ -68,6 +159,21 @@ class TestAgentMemory:
         assert "memories" in result
         assert isinstance(result["memories"], list)
 
+    async def test_memory_retrieval_prefers_ingested_user_content(self, test_user: User, mocker):
+        """The ingest-time user message should be used as the memory query."""
+        search = mocker.patch("app.core.memory.memory_manager.search_memory", return_value=[])
+
+        from app.core.agent import retrieve_memories
+
+        state = {
+            "messages": [HumanMessage(content="older question about the garden"), AIMessage(content="ok")],
+            "user": test_user,
+            "last_user_content": "what is the weather tomorrow",
+        }
+
+        await retrieve_memories(state)
+        search.assert_awaited_once_with(user_id=test_user.id, query="what is the weather tomorrow")
+
 
 def test_should_continue_loops_when_verification_required():
     state = {
@@ -55,3 +55,20 @@ class TestCurrentUserAuth:
 
         assert response.status_code == 200
         assert response.json()["user_id"] == test_user.id
+
+
+async def test_api_key_lookup_caches_user_id_and_rechecks_key(test_db, test_user, monkeypatch):
+    from app.core import auth
+
+    monkeypatch.setattr(auth, "_api_key_user_ids", {})
+
+    assert (await auth._get_user_by_api_key(test_db, "test_key")).id == test_user.id
+    assert auth._api_key_user_ids[auth._api_key_digest("test_key")][0] == test_user.id
+    assert (await auth._get_user_by_api_key(test_db, "test_key")).id == test_user.id
+
+    test_user.api_key = "rotated_key"
+    test_db.add(test_user)
+    await test_db.commit()
+
+    assert await auth._get_user_by_api_key(test_db, "test_key") is None
+    assert auth._api_key_digest("test_key") not in auth._api_key_user_ids
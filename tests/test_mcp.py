@@ -3,6 +3,7 @@ Tests for MCP tool loading and execution.
 """
 
 import pytest
+from sqlmodel import select
 
 from app.core.mcp_manager import MCPManager
 
@@ -27,6 +28,181 @@ class TestMCPManager:
             # Expected to fail in test environment without MCP servers
             pytest.skip(f"MCP servers not available: {e}")
 
+    async def test_servers_connect_concurrently_in_config_order(self, monkeypatch):
+        """Servers should connect in parallel, register in config order and close on cleanup."""
+        import asyncio
+
+        manager = MCPManager()
+        servers = {"slow": {"delay": 0.2}, "failing": {"delay": 0.0}, "fast": {"delay": 0.0}}
+        closed = []
+
+        async def fake_load_from_db():
+            return servers
+
+        async def fake_connect(stack, name, server_conf):
+            await asyncio.sleep(server_conf["delay"])
+            if name == "failing":
+                return None
+            stack.callback(closed.append, name)
+            return f"session-{name}", [f"tool-{name}"]
+
+        monkeypatch.setattr(manager, "_load_from_db", fake_load_from_db)
+        monkeypatch.setattr(manager, "_connect", fake_connect)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await manager.initialize()
+        assert loop.time() - started < 0.35
+
+        assert list(manager.sessions) == ["slow", "fast"]
+        assert manager.tools == ["tool-slow", "tool-fast"]
+        assert closed == []
+
+        await manager.cleanup()
+        assert sorted(closed) == ["fast", "slow"]
+        assert manager.sessions == {} and manager.tools == []
+
+    async def test_hanging_server_is_skipped_after_init_timeout(self, monkeypatch):
+        """A server that never finishes connecting should be dropped without blocking the rest."""
+        import asyncio
+
+        manager = MCPManager()
+        servers = {"hanging": {"init_timeout": 0.05}, "ok": {}}
+        closed = []
+
+        async def fake_load_from_db():
+            return servers
+
+        async def fake_connect(stack, name, server_conf):
+            stack.callback(closed.append, name)
+            if name == "hanging":
+                await asyncio.Event().wait()
+            return f"session-{name}", [f"tool-{name}"]
+
+        monkeypatch.setattr(manager, "_load_from_db", fake_load_from_db)
+        monkeypatch.setattr(manager, "_connect", fake_connect)
+
+        await asyncio.wait_for(manager.initialize(), 1)
+        assert list(manager.sessions) == ["ok"]
+        await asyncio.sleep(0)
+        assert closed == ["hanging"]
+
+        await manager.cleanup()
+        assert sorted(closed) == ["hanging", "ok"]
+
+    async def test_reload_only_reconnects_changed_servers(self, monkeypatch):
+        """Reload should keep unchanged connections and reconnect changed, new or failed servers."""
+        servers = {"same": {"v": 1}, "changed": {"v": 1}, "removed": {"v": 1}, "failing": {"v": 1}}
+        manager = MCPManager()
+        connects = []
+        closed = []
+        failed_once = []
+
+        async def fake_load_from_db():
+            return dict(servers)
+
+        async def fake_connect(stack, name, server_conf):
+            connects.append(name)
+            stack.callback(closed.append, name)
+            if name == "failing" and not failed_once:
+                failed_once.append(name)
+                return None
+            return f"session-{name}-{server_conf['v']}", [f"tool-{name}"]
+
+        monkeypatch.setattr(manager, "_load_from_db", fake_load_from_db)
+        monkeypatch.setattr(manager, "_connect", fake_connect)
+
+        await manager.initialize()
+        assert list(manager.sessions) == ["same", "changed", "removed"]
+
+        servers = {"new": {"v": 1}, "same": {"v": 1}, "changed": {"v": 2}, "failing": {"v": 1}}
+        connects.clear()
+        await manager.reload()
+
+        assert sorted(connects) == ["changed", "failing", "new"]
+        assert sorted(closed) == ["changed", "failing", "removed"]
+        assert manager.sessions["changed"] == "session-changed-2"
+        assert list(manager.sessions) == ["new", "same", "changed", "failing"]
+        assert manager.tools == ["tool-new", "tool-same", "tool-changed", "tool-failing"]
+
+        await manager.cleanup()
+
+    async def test_reload_reconnects_a_server_whose_connection_died(self, monkeypatch):
+        """A server whose connection task ended on its own should be reconnected by reload."""
+        import asyncio
+
+        manager = MCPManager()
+        connects = []
+
+        async def fake_load_from_db():
+            return {"crashy": {"v": 1}}
+
+        async def fake_connect(stack, name, server_conf):
+            connects.append(name)
+            return f"session-{len(connects)}", [f"tool-{name}"]
+
+        monkeypatch.setattr(manager, "_load_from_db", fake_load_from_db)
+        monkeypatch.setattr(manager, "_connect", fake_connect)
+
+        await manager.initialize()
+        task = manager._server_tasks["crashy"]
+        task.cancel()  # stands in for the transport failing underneath the parked task
+        await asyncio.gather(task, return_exceptions=True)
+        assert "crashy" not in manager._server_sessions
+
+        await manager.reload()
+        assert connects == ["crashy", "crashy"]
+        assert manager.sessions == {"crashy": "session-2"}
+
+        await manager.cleanup()
+
+    async def test_global_secrets_are_batched_and_invalidated(self, test_db, monkeypatch):
+        """Plugin secrets should load in one query, be served from cache, and refresh after invalidation."""
+        from app.core.security import encrypt_secret
+        from app.models.secret import Secret, SecretScope
+
+        monkeypatch.setattr(MCPManager, "_secret_cache", {})
+        test_db.add(
+            Secret(key="TOKEN", encrypted_value=encrypt_secret("a"), scope=SecretScope.global_scope, plugin_id=1)
+        )
+        test_db.add(
+            Secret(key="TOKEN", encrypted_value=encrypt_secret("b"), scope=SecretScope.global_scope, plugin_id=2)
+        )
+        await test_db.commit()
+
+        manager = MCPManager()
+        await manager._prefetch_global_secrets([1, 2, 3])
+        assert set(MCPManager._secret_cache) == {1, 2, 3}
+        assert await manager._fetch_global_secrets(2) == {"TOKEN": "b"}
+        assert await manager._fetch_global_secrets(3) == {}
+
+        secret = (await test_db.execute(select(Secret).where(Secret.plugin_id == 1))).scalars().one()
+        secret.encrypted_value = encrypt_secret("rotated")
+        await test_db.commit()
+        assert await manager._fetch_global_secrets(1) == {"TOKEN": "a"}
+        MCPManager.invalidate_secrets(1)
+        assert await manager._fetch_global_secrets(1) == {"TOKEN": "rotated"}
+
+    async def test_plugin_catalog_is_reparsed_only_when_the_file_changes(self, tmp_path, monkeypatch):
+        """The catalog should be served from cache until its mtime changes."""
+        import json
+        import os
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(MCPManager, "_catalog_cache", None)
+        catalog_file = tmp_path / "plugin_catalog.json"
+        catalog_file.write_text(json.dumps([{"id": "a", "config": {}}]))
+
+        manager = MCPManager()
+        first = await manager._load_catalog()
+        assert list(first) == ["a"]
+        assert await manager._load_catalog() is first
+
+        catalog_file.write_text(json.dumps([{"id": "b"}]))
+        stat = catalog_file.stat()
+        os.utime(catalog_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert list(await manager._load_catalog()) == ["b"]
+
 
 class TestMCPMiddleware:
     """Tests for MCP Middleware caching and throttling."""
@@ -71,3 +247,18 @@ class TestMCPMiddleware:
         key_after = MCPMiddleware._get_cache_key("test_tool", args_injected, injected_keys=["api_key"])
 
         assert key_before == key_after
+
+
+def test_args_schema_is_cached_per_schema():
+    """Identical tool schemas should reuse one pydantic model regardless of key order or tool."""
+    import json
+
+    from app.core.mcp_manager import _create_args_schema
+
+    schema = {"properties": {"q": {"type": "string"}, "n": {"type": "integer"}}, "required": ["q"]}
+    reordered = {"required": ["q"], "properties": {"n": {"type": "integer"}, "q": {"type": "string"}}}
+
+    model = _create_args_schema(json.dumps(schema, sort_keys=True))
+    assert _create_args_schema(json.dumps(reordered, sort_keys=True)) is model
+    assert _create_args_schema(json.dumps({"properties": {"q": {"type": "string"}}}, sort_keys=True)) is not model
+    assert model(q="x").n is None
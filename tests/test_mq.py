@@ -44,3 +44,36 @@ async def test_queue_empty(mocker):
     mock_redis.rpop.return_value = None
     popped = await MQService.pop_inbox()
     assert popped is None
+
+
+@pytest.mark.asyncio
+async def test_push_outbox_many_uses_single_lpush(mocker):
+    """Batch pushes go out as one LPUSH; an empty batch never touches Redis."""
+    mock_redis = AsyncMock()
+    mocker.patch("app.core.mq.redis.from_url", return_value=mock_redis)
+    MQService._redis_instances = {}
+
+    messages = [
+        UnifiedMessage(channel=ChannelType.TELEGRAM, channel_id=str(i), content="hi", msg_type=MessageType.TEXT)
+        for i in range(3)
+    ]
+    await MQService.push_outbox_many([])
+    await MQService.push_outbox_many(messages)
+
+    mock_redis.lpush.assert_called_once_with(MQService.OUTBOX_KEY, *(m.model_dump_json() for m in messages))
+
+
+@pytest.mark.asyncio
+async def test_pop_outbox_blocking_uses_brpop(mocker):
+    """Blocking pop parks on BRPOP and returns None when it times out."""
+    mock_redis = AsyncMock()
+    mocker.patch("app.core.mq.redis.from_url", return_value=mock_redis)
+    MQService._redis_instances = {}
+
+    msg = UnifiedMessage(channel=ChannelType.TELEGRAM, channel_id="1", content="hi", msg_type=MessageType.TEXT)
+    mock_redis.brpop.side_effect = [(MQService.OUTBOX_KEY, msg.model_dump_json()), None]
+
+    popped = await MQService.pop_outbox_blocking(timeout=1.0)
+    assert popped.id == msg.id
+    assert await MQService.pop_outbox_blocking(timeout=1.0) is None
+    mock_redis.brpop.assert_called_with(MQService.OUTBOX_KEY, timeout=1.0)
@@ -24,3 +24,84 @@ def test_mask_secrets_empty():
     assert mask_secrets(None) is None
     assert mask_secrets({}) == {}
     assert mask_secrets([]) == []
+
+
+async def test_update_audit_entry_sets_final_status(test_db, monkeypatch):
+    import app.core.db
+    from app.core.audit import create_audit_entry, update_audit_entry
+    from app.models.audit import AuditLog
+
+    monkeypatch.setattr("app.core.audit.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+
+    log_id = await create_audit_entry("trace-1", "tool_execution", None, "echo", {"token": "abc"})
+    await update_audit_entry(log_id, "FAILURE", 12.5, "boom")
+
+    entry = await test_db.get(AuditLog, log_id)
+    assert entry.status == "FAILURE"
+    assert entry.duration_ms == 12.5
+    assert entry.error_message == "boom"
+    assert entry.completed_at is not None
+    assert entry.tool_args == {"token": "********"}
+
+
+def test_mask_secrets_matches_keys_case_insensitively():
+    masked = mask_secrets({"X-Auth-Header": "abc", "GitHubToken": "ghp", 3: "non-string key", "name": "ok"})
+
+    assert masked["X-Auth-Header"] == "********"
+    assert masked["GitHubToken"] == "********"
+    assert masked[3] == "non-string key"
+    assert masked["name"] == "ok"
+
+
+def test_mask_secrets_returns_input_when_nothing_to_mask():
+    data = {"query": "weather", "options": [{"units": "metric"}]}
+
+    assert mask_secrets(data) is data
+
+
+async def test_audit_interceptor_tracks_background_update(monkeypatch):
+    import asyncio
+
+    from app.core import audit
+
+    updates = []
+
+    async def fake_update(log_id, status, duration_ms, error_message=None):
+        updates.append((log_id, status))
+
+    monkeypatch.setattr(audit, "update_audit_entry", fake_update)
+    interceptor = audit.AuditInterceptor(trace_id=None, user_id=None, tool_name="clock", tool_args={})
+    interceptor.start_time = 0.0
+    interceptor.log_id = 7
+
+    await interceptor.__aexit__(None, None, None)
+    assert len(audit._background_tasks) == 1
+
+    await asyncio.gather(*audit._background_tasks)
+    assert updates == [(7, "SUCCESS")]
+    assert not audit._background_tasks
+
+
+def test_audit_write_semaphore_is_created_per_event_loop(monkeypatch):
+    import asyncio
+
+    from app.core import audit
+
+    monkeypatch.setattr(audit, "_audit_write_semaphores", {})
+
+    async def current():
+        semaphore = audit._audit_write_semaphore()
+        assert audit._audit_write_semaphore() is semaphore
+        async with semaphore:
+            return semaphore
+
+    loop_a, loop_b = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        first = loop_a.run_until_complete(current())
+        second = loop_b.run_until_complete(current())
+    finally:
+        loop_a.close()
+        loop_b.close()
+
+    assert first is not second
+    assert len(audit._audit_write_semaphores) == 2
@@ -0,0 +1,266 @@
+from app.core.auth_service import AuthService, build_tool_domain_index
+
+
+async def test_get_redis_reuses_client_within_loop():
+    await AuthService.close()
+
+    first = AuthService._get_redis()
+    second = AuthService._get_redis()
+
+    assert first is second
+    assert first.connection_pool.max_connections == 32
+    await AuthService.close()
+    assert AuthService._get_redis() is not first
+    await AuthService.close()
+
+
+async def test_verify_bind_token_consumes_token_with_getdel(mocker):
+    fake_redis = mocker.AsyncMock()
+    fake_redis.getdel.return_value = "42"
+    mocker.patch.object(AuthService, "_get_redis", return_value=fake_redis)
+
+    assert await AuthService.verify_bind_token("123456") == 42
+    fake_redis.getdel.assert_awaited_once_with("bind:123456")
+    fake_redis.get.assert_not_called()
+
+
+async def test_verify_bind_token_returns_none_for_unknown_token(mocker):
+    fake_redis = mocker.AsyncMock()
+    fake_redis.getdel.return_value = None
+    mocker.patch.object(AuthService, "_get_redis", return_value=fake_redis)
+
+    assert await AuthService.verify_bind_token("000000") is None
+
+
+async def test_consume_telegram_login_exchange_is_one_time(mocker):
+    import json
+
+    challenge = {"status": "approved", "csrf_token": "csrf", "exchange_token": "ex"}
+    exchange = {"challenge_id": "ch", "user_id": 5}
+    fake_redis = mocker.AsyncMock()
+    fake_redis.mget.return_value = [json.dumps(challenge), json.dumps(exchange)]
+    fake_redis.delete.side_effect = [2, 0]
+    mocker.patch.object(AuthService, "_get_redis", return_value=fake_redis)
+    mocker.patch("app.core.auth_service.record_audit_event")
+
+    assert await AuthService.consume_telegram_login_exchange("ch", "ex", "csrf") == 5
+    assert await AuthService.consume_telegram_login_exchange("ch", "ex", "csrf") is None
+    fake_redis.mget.assert_awaited_with("auth_challenge:ch", "auth_exchange:ex")
+    fake_redis.delete.assert_awaited_with("auth_challenge:ch", "auth_exchange:ex")
+
+
+async def test_get_user_by_identity_resolves_user_and_touches_last_seen(test_db, test_user, monkeypatch):
+    import app.core.db
+    from app.models.user import UserIdentity
+
+    monkeypatch.setattr("app.core.auth_service.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+    identity = UserIdentity(user_id=test_user.id, provider="telegram", provider_user_id="tg-1")
+    test_db.add(identity)
+    await test_db.commit()
+
+    user = await AuthService.get_user_by_identity("telegram", "tg-1")
+
+    assert user.id == test_user.id
+    await test_db.refresh(identity)
+    first_seen = identity.last_seen
+    assert first_seen is not None
+
+    await AuthService.get_user_by_identity("telegram", "tg-1")
+    await test_db.refresh(identity)
+    assert identity.last_seen == first_seen
+    assert await AuthService.get_user_by_identity("telegram", "missing") is None
+
+
+def test_get_allowed_tools_applies_deny_list_domains_and_groups():
+    from types import SimpleNamespace
+
+    from app.models.user import User
+
+    user = User(username="member", role="user", policy={"deny_tools": ["forbidden"], "allow_domains": ["standard"]})
+    tools = [
+        SimpleNamespace(name="forbidden", metadata={}),
+        SimpleNamespace(name="clock", metadata={}),
+        SimpleNamespace(name="lights", metadata={"domain": "home_automation"}),
+        SimpleNamespace(name="family_only", metadata={"allowed_groups": ["family"]}),
+        SimpleNamespace(name="admin_only", metadata={"required_role": "admin"}),
+    ]
+
+    assert [t.name for t in AuthService.get_allowed_tools(user, tools)] == ["clock"]
+    is_permitted = AuthService.permission_checker(user)
+    assert not is_permitted("forbidden")
+    assert is_permitted("clock")
+    assert not is_permitted("lights", domain="home_automation")
+    assert AuthService.check_tool_permission(User(username="guest", role="user"), "weather_now", domain="weather")
+
+
+def test_get_allowed_tools_keeps_catalog_order_across_domains():
+    from types import SimpleNamespace
+
+    from app.models.user import User
+
+    user = User(username="member", role="user", groups=["family"], policy={"allow_domains": ["weather", "standard"]})
+    tools = [
+        SimpleNamespace(name="forecast", metadata={"domain": "weather"}),
+        SimpleNamespace(name="family_only", metadata={"allowed_groups": ["family"]}),
+        SimpleNamespace(name="clock", metadata={}),
+        SimpleNamespace(name="lights", metadata={"domain": "home_automation"}),
+        SimpleNamespace(name="radar", metadata={"category": "weather"}),
+    ]
+
+    expected = ["forecast", "family_only", "clock", "radar"]
+    assert [t.name for t in AuthService.get_allowed_tools(user, tools)] == expected
+    index = build_tool_domain_index(tools)
+    assert [t.name for t in AuthService.get_allowed_tools(user, tools, index)] == expected
+
+
+def test_get_allowed_tools_sees_metadata_changed_in_place():
+    from types import SimpleNamespace
+
+    from app.models.user import User
+
+    user = User(username="member", role="user", policy={"allow_domains": ["standard"]})
+    lights = SimpleNamespace(name="lights", metadata={})
+    tools = [SimpleNamespace(name="clock", metadata={}), lights]
+
+    assert [t.name for t in AuthService.get_allowed_tools(user, tools)] == ["clock", "lights"]
+    lights.metadata["domain"] = "home_automation"
+    assert [t.name for t in AuthService.get_allowed_tools(user, tools)] == ["clock"]
+    lights.metadata.update(domain="standard", required_role="admin")
+    assert [t.name for t in AuthService.get_allowed_tools(user, tools)] == ["clock"]
+
+
+def test_get_allowed_tools_admin_keeps_only_deny_list():
+    from types import SimpleNamespace
+
+    from app.models.user import User
+
+    admin = User(username="root", role="admin", policy={"deny_tools": ["forbidden"]})
+    tools = [
+        SimpleNamespace(name="forbidden", metadata={}),
+        SimpleNamespace(name="lights", metadata={"domain": "home_automation", "allowed_groups": ["family"]}),
+    ]
+
+    assert [t.name for t in AuthService.get_allowed_tools(admin, tools)] == ["lights"]
+    assert [t.name for t in AuthService.get_allowed_tools(admin, tools, build_tool_domain_index(tools))] == ["lights"]
+
+
+async def test_notify_admins_pushes_to_each_admin_identity(test_db, admin_user, test_user, monkeypatch, mocker):
+    import app.core.db
+    from app.models.user import UserIdentity
+
+    monkeypatch.setattr("app.core.auth_service.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+    test_db.add(UserIdentity(user_id=admin_user.id, provider="telegram", provider_user_id="tg-admin"))
+    test_db.add(UserIdentity(user_id=admin_user.id, provider="carrier-pigeon", provider_user_id="coo"))
+    test_db.add(UserIdentity(user_id=test_user.id, provider="telegram", provider_user_id="tg-user"))
+    await test_db.commit()
+    push = mocker.patch("app.core.mq.MQService.push_outbox_many")
+
+    await AuthService.notify_admins("disk full")
+
+    messages = push.await_args.args[0]
+    assert [msg.channel_id for msg in messages] == ["tg-admin"]
+    assert messages[0].content == "disk full"
+
+
+async def test_notify_admins_pushes_once_per_shared_channel(mocker):
+    session_factory = mocker.patch("app.core.auth_service.AsyncSessionLocal")
+    session = session_factory.return_value.__aenter__.return_value
+    session.execute.return_value.all = mocker.Mock(
+        return_value=[("admin", "telegram", "ops-group"), ("admin2", "telegram", "ops-group")]
+    )
+    push = mocker.patch("app.core.mq.MQService.push_outbox_many")
+
+    await AuthService.notify_admins("disk full")
+
+    assert len(push.await_args.args[0]) == 1
+
+
+async def test_notify_admins_sends_one_batch_and_swallows_broker_errors(test_db, admin_user, monkeypatch, mocker):
+    import app.core.db
+    from app.models.user import UserIdentity
+
+    monkeypatch.setattr("app.core.auth_service.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+    test_db.add(UserIdentity(user_id=admin_user.id, provider="telegram", provider_user_id="tg-admin"))
+    test_db.add(UserIdentity(user_id=admin_user.id, provider="feishu", provider_user_id="fs-admin"))
+    await test_db.commit()
+    push = mocker.patch("app.core.mq.MQService.push_outbox_many", side_effect=ConnectionError("down"))
+
+    await AuthService.notify_admins("disk full")
+
+    assert push.await_count == 1
+    assert sorted(msg.channel_id for msg in push.await_args.args[0]) == ["fs-admin", "tg-admin"]
+
+
+async def test_bind_identity_promotes_guest_with_single_update(test_db, monkeypatch, mocker):
+    import app.core.db
+    from app.core.auth_service import BindResult
+    from app.models.user import User
+
+    monkeypatch.setattr("app.core.auth_service.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+    mocker.patch("app.core.auth_service.record_audit_event")
+    guest = User(username="visitor", role="guest", api_key="guest_key")
+    test_db.add(guest)
+    await test_db.commit()
+
+    assert await AuthService.bind_identity(guest.id, "telegram", "tg-guest") == BindResult.SUCCESS
+
+    await test_db.refresh(guest)
+    assert guest.role == "user"
+
+
+async def test_bind_identity_reports_provider_and_user_conflicts(test_db, test_user, admin_user, monkeypatch, mocker):
+    import app.core.db
+    from app.core.auth_service import BindResult
+    from app.models.user import UserIdentity
+
+    monkeypatch.setattr("app.core.auth_service.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+    mocker.patch("app.core.auth_service.record_audit_event")
+    test_db.add(UserIdentity(user_id=test_user.id, provider="telegram", provider_user_id="tg-1"))
+    await test_db.commit()
+
+    assert await AuthService.bind_identity(test_user.id, "telegram", "tg-1") == BindResult.SUCCESS
+    assert await AuthService.bind_identity(admin_user.id, "telegram", "tg-1") == BindResult.PROVIDER_CONFLICT
+    assert await AuthService.bind_identity(test_user.id, "telegram", "tg-2") == BindResult.USER_CONFLICT
+    assert await AuthService.bind_identity(test_user.id, "feishu", "tg-1") == BindResult.SUCCESS
+
+
+async def test_identity_reads_raise_on_lazy_relationships(test_db, test_user, monkeypatch, mocker):
+    import pytest
+    from sqlalchemy.exc import InvalidRequestError
+
+    import app.core.db
+    from app.models.user import UserIdentity
+
+    monkeypatch.setattr("app.core.auth_service.AsyncSessionLocal", app.core.db.AsyncSessionLocal)
+    mocker.patch("app.core.auth_service.record_audit_event")
+    test_db.add(UserIdentity(user_id=test_user.id, provider="telegram", provider_user_id="tg-1"))
+    await test_db.commit()
+
+    user = await AuthService.get_user_by_identity("telegram", "tg-1")
+    with pytest.raises(InvalidRequestError):
+        user.identities
+
+    assert await AuthService.unbind_identity("telegram", "tg-1") is True
+    assert await AuthService.get_user_by_identity("telegram", "tg-1") is None
+
+
+async def test_create_bind_token_retries_on_collision(mocker):
+    fake_redis = mocker.AsyncMock()
+    fake_redis.set.side_effect = [None, True]
+    mocker.patch.object(AuthService, "_get_redis", return_value=fake_redis)
+    mocker.patch("app.core.auth_service.record_audit_event")
+
+    token = await AuthService.create_bind_token(7)
+
+    assert fake_redis.set.await_count == 2
+    fake_redis.set.assert_awaited_with(f"bind:{token}", "7", ex=300, nx=True)
+
+
+async def test_create_bind_token_is_zero_padded_six_digits(mocker):
+    fake_redis = mocker.AsyncMock()
+    fake_redis.set.return_value = True
+    mocker.patch.object(AuthService, "_get_redis", return_value=fake_redis)
+    mocker.patch("app.core.auth_service.record_audit_event")
+    mocker.patch("app.core.auth_service.secrets.randbelow", return_value=42)
+
+    assert await AuthService.create_bind_token(7) == "000042"
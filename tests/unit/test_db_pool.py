@@ -0,0 +1,44 @@
+from app.core.db import _connect_args, _pool_options, get_pool_status
+
+
+def test_pool_options_skip_sqlite():
+    assert _pool_options("sqlite+aiosqlite:///tmp/test.db") == {}
+
+
+def test_pool_options_size_server_pool(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    options = _pool_options("postgresql+asyncpg://nexus:pw@localhost:5432/nexus_db")
+
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["max_overflow"] == 16
+
+
+def test_connect_args_only_for_asyncpg(monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "0")
+
+    assert _connect_args("sqlite+aiosqlite:///tmp/test.db") == {}
+    assert _connect_args("postgresql+asyncpg://nexus:pw@localhost:5432/nexus_db") == {
+        "statement_cache_size": 0,
+        "server_settings": {"jit": "off"},
+    }
+
+
+def test_get_pool_status_reports_pool_class():
+    assert "pool" in get_pool_status()
+
+
+async def test_init_db_bootstraps_admin_once(test_db):
+    from sqlmodel import select
+
+    from app.core import db
+    from app.models.user import User
+
+    await db.init_db()
+    await db.init_db()
+
+    users = (await test_db.execute(select(User))).scalars().all()
+    assert len(users) == 1
+    assert users[0].role == "admin"
+    assert users[0].groups == ["default"]
+    assert users[0].policy == {}
@@ -0,0 +1,23 @@
+from app.core.decorators import request_user_scope, with_user
+from app.models.user import User
+
+
+@with_user()
+async def whoami(user_id=None, **kwargs):
+    user = kwargs.get("user_object")
+    return user.username if user else None
+
+
+async def test_with_user_reuses_users_within_request_scope(mocker):
+    session_factory = mocker.patch("app.core.db.AsyncSessionLocal")
+    session = session_factory.return_value.__aenter__.return_value
+    session.get = mocker.AsyncMock(return_value=User(id=2, username="loaded"))
+
+    with request_user_scope(User(id=1, username="seeded")):
+        assert await whoami(user_id=1) == "seeded"
+        assert await whoami(user_id=2) == "loaded"
+        assert await whoami(user_id=2) == "loaded"
+    assert session.get.await_count == 1
+
+    assert await whoami(user_id=2) == "loaded"
+    assert session.get.await_count == 2
@@ -0,0 +1,257 @@
+from types import SimpleNamespace
+
+from app.core.designer import MemSkillDesigner
+
+
+def _skill(skill_id: int, name: str):
+    return SimpleNamespace(
+        id=skill_id,
+        name=name,
+        skill_type="encoding",
+        description="test skill",
+        prompt_template="Summarize {{ content }}",
+        positive_count=2,
+        negative_count=8,
+    )
+
+
+def test_parse_batch_evolution_response_splits_by_skill_index():
+    text = """### Skill[0] Analysis
+Too vague.
+
+### Skill[0] Improved Prompt
+```
+Extract facts from {{ content }}
+```
+
+### Skill[1] Analysis
+Too long.
+"""
+
+    parsed = MemSkillDesigner._parse_batch_evolution_response(text)
+
+    assert parsed == {0: ("Too vague.", "Extract facts from {{ content }}")}
+
+
+def test_parse_evolution_response_strips_fences_and_tolerates_missing_analysis():
+    text = "### Analysis\nToo vague.\n\n### Improved Prompt\n```text\nExtract facts from {{ content }}\n```\n"
+
+    assert MemSkillDesigner._parse_evolution_response(text) == ("Too vague.", "Extract facts from {{ content }}")
+    assert MemSkillDesigner._parse_evolution_response("Vague.\n### Improved Prompt\nP") == ("Vague.", "P")
+    assert MemSkillDesigner._parse_evolution_response("no sections here") == ("", "")
+
+
+async def test_evolve_skills_batch_uses_one_designer_call(mocker):
+    skills = [_skill(1, "facts"), _skill(2, "no_samples"), _skill(3, "prefs")]
+    mocker.patch.object(
+        MemSkillDesigner,
+        "get_recent_samples",
+        side_effect=lambda skill_id, limit=5: [] if skill_id == 2 else [{"content": "user likes tea"}],
+    )
+    llm = mocker.AsyncMock()
+    llm.ainvoke.return_value = SimpleNamespace(
+        content="### Skill[0] Analysis\nA\n### Skill[0] Improved Prompt\nP0\n"
+        "### Skill[1] Analysis\nB\n### Skill[1] Improved Prompt\nP1\n"
+    )
+    mocker.patch("app.core.designer.get_llm_client", return_value=llm)
+    mocker.patch.object(MemSkillDesigner, "test_canary", return_value=True)
+    save = mocker.patch.object(MemSkillDesigner, "_save_changelogs", return_value=[11, 12])
+
+    results = await MemSkillDesigner.evolve_skills_batch(skills)
+
+    assert llm.ainvoke.await_count == 1
+    assert save.await_count == 1
+    assert [(r["skill_name"], r["new_prompt"], r["changelog_id"]) if r else None for r in results] == [
+        ("facts", "P0", 11),
+        None,
+        ("prefs", "P1", 12),
+    ]
+
+
+async def test_evolve_skills_batch_single_skill_fetches_samples_once(mocker):
+    fetch = mocker.patch.object(MemSkillDesigner, "get_recent_samples", return_value=[{"content": "user likes tea"}])
+    llm = mocker.AsyncMock()
+    llm.ainvoke.return_value = SimpleNamespace(content="### Analysis\nA\n### Improved Prompt\nP")
+    mocker.patch("app.core.designer.get_llm_client", return_value=llm)
+    mocker.patch.object(MemSkillDesigner, "_run_canary_sample", return_value=True)
+    mocker.patch.object(MemSkillDesigner, "_save_changelogs", return_value=[21])
+
+    results = await MemSkillDesigner.evolve_skills_batch([_skill(1, "facts")])
+
+    # The canary reuses the samples fetched for the Designer prompt
+    assert fetch.await_count == 1
+    assert [(r["new_prompt"], r["changelog_id"]) for r in results] == [("P", 21)]
+
+
+async def test_canary_runs_samples_concurrently(mocker):
+    import asyncio
+
+    in_flight = 0
+    peak = 0
+
+    async def ainvoke(messages):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return SimpleNamespace(content="short" if "bad" in messages[0].content else "user likes green tea")
+
+    samples = [{"content": "user likes green tea"}, {"content": "user likes black tea"}, {"content": "bad"}]
+    mocker.patch.object(MemSkillDesigner, "get_recent_samples", return_value=samples)
+    mocker.patch("app.core.designer.get_llm_client", return_value=SimpleNamespace(ainvoke=ainvoke))
+
+    assert await MemSkillDesigner.test_canary(_skill(1, "facts"), "Facts: {{ content }}") is True
+    assert peak == 3
+
+
+async def test_canary_sample_renders_placeholders_in_one_pass(mocker):
+    llm = mocker.AsyncMock()
+    llm.ainvoke.return_value = SimpleNamespace(content="user likes tea")
+    sample = {"content": "user likes tea {{ context }}"}
+
+    assert await MemSkillDesigner._run_canary_sample(llm, "Facts: {{content}} | {{ context }}.", sample) is True
+
+    assert llm.ainvoke.await_args.args[0][0].content == "Facts: user likes tea {{ context }} | ."
+
+
+async def test_evolve_skill_keeps_skill_data_out_of_the_static_prefix(mocker):
+    from app.core.designer import DESIGNER_SYSTEM_PROMPT
+
+    mocker.patch.object(MemSkillDesigner, "get_recent_samples", return_value=[{"content": "user likes tea"}])
+    llm = mocker.AsyncMock()
+    llm.ainvoke.return_value = SimpleNamespace(content="### Analysis\nA\n### Improved Prompt\nP")
+    mocker.patch("app.core.designer.get_llm_client", return_value=llm)
+    mocker.patch.object(MemSkillDesigner, "_canary_proposal", return_value=None)
+
+    await MemSkillDesigner.evolve_skill(_skill(1, "facts"))
+
+    system, human = llm.ainvoke.await_args.args[0]
+    assert system.content == DESIGNER_SYSTEM_PROMPT
+    assert "{{ content }}" in system.content
+    assert "facts" in human.content and "user likes tea" in human.content
+
+
+async def test_find_underperforming_skills_filters_in_sql(test_db, monkeypatch):
+    from app.models.memory_skill import MemorySkill
+
+    monkeypatch.setattr(MemSkillDesigner, "MIN_TOTAL_USES", 10)
+    monkeypatch.setattr(MemSkillDesigner, "NEGATIVE_RATE_THRESHOLD", 0.3)
+    for name, positive, negative, status in [
+        ("failing", 6, 4, "active"),
+        ("borderline", 7, 3, "active"),
+        ("too_new", 0, 5, "active"),
+        ("retired", 0, 20, "deprecated"),
+    ]:
+        test_db.add(
+            MemorySkill(
+                name=name,
+                description=name,
+                skill_type="encoding",
+                prompt_template="{{ content }}",
+                positive_count=positive,
+                negative_count=negative,
+                status=status,
+            )
+        )
+    await test_db.commit()
+
+    skills = await MemSkillDesigner.find_underperforming_skills()
+
+    assert [skill.name for skill in skills] == ["failing"]
+
+
+async def test_save_changelogs_inserts_all_rows_in_one_commit(test_db):
+    from sqlmodel import select
+
+    from app.models.memory_skill import MemorySkill, MemorySkillChangelog
+
+    skills = [
+        MemorySkill(name=name, description=name, skill_type="encoding", prompt_template="old {{ content }}")
+        for name in ("facts", "prefs")
+    ]
+    test_db.add_all(skills)
+    await test_db.commit()
+    proposals = [
+        {"skill": skills[0], "new_prompt": "new facts", "reason": "vague", "canary_passed": True},
+        {"skill": skills[1], "new_prompt": "new prefs", "reason": "verbose", "canary_passed": False},
+    ]
+
+    ids = await MemSkillDesigner._save_changelogs(proposals)
+
+    rows = (await test_db.execute(select(MemorySkillChangelog).order_by(MemorySkillChangelog.id))).scalars().all()
+    assert ids == [row.id for row in rows]
+    assert [(row.skill_name, row.old_prompt, row.status) for row in rows] == [
+        ("facts", "old {{ content }}", "canary"),
+        ("prefs", "old {{ content }}", "rejected"),
+    ]
+
+
+async def test_record_feedback_is_buffered_until_flush(test_db, monkeypatch):
+    from app.models.memory_skill import MemorySkill
+
+    monkeypatch.setattr(MemSkillDesigner, "_feedback_buffer", {})
+    monkeypatch.setattr(MemSkillDesigner, "_feedback_task", None)
+    monkeypatch.setattr(MemSkillDesigner, "FEEDBACK_FLUSH_SECONDS", 60)
+    skill = MemorySkill(name="facts", description="facts", skill_type="encoding", prompt_template="{{ content }}")
+    test_db.add(skill)
+    await test_db.commit()
+
+    await MemSkillDesigner.record_feedback(skill.id, is_positive=True)
+    await MemSkillDesigner.record_feedback(skill.id, is_positive=False)
+    await MemSkillDesigner.record_feedback(skill.id, is_positive=False)
+    await test_db.refresh(skill)
+    assert (skill.positive_count, skill.negative_count) == (0, 0)
+
+    await MemSkillDesigner.flush_feedback()
+    MemSkillDesigner._feedback_task[1].cancel()
+
+    await test_db.refresh(skill)
+    assert (skill.positive_count, skill.negative_count) == (1, 2)
+    assert MemSkillDesigner._feedback_buffer == {}
+
+
+async def test_stop_feedback_flusher_cancels_loop_and_keeps_buffer(monkeypatch):
+    monkeypatch.setattr(MemSkillDesigner, "_feedback_buffer", {})
+    monkeypatch.setattr(MemSkillDesigner, "_feedback_task", None)
+    monkeypatch.setattr(MemSkillDesigner, "FEEDBACK_FLUSH_SECONDS", 60)
+
+    await MemSkillDesigner.record_feedback(3, is_positive=True)
+    task = MemSkillDesigner._feedback_task[1]
+
+    await MemSkillDesigner.stop_feedback_flusher()
+
+    assert task.cancelled()
+    assert MemSkillDesigner._feedback_task is None
+    assert MemSkillDesigner._feedback_buffer == {3: [1, 0]}
+
+
+async def test_get_recent_samples_returns_newest_content_rows(test_db):
+    from datetime import datetime, timedelta
+
+    from app.models.memory import Memory
+    from app.models.memory_skill import MemorySkill
+
+    skill = MemorySkill(name="facts", description="facts", skill_type="encoding", prompt_template="{{ content }}")
+    test_db.add(skill)
+    await test_db.commit()
+    base = datetime(2026, 1, 1)
+    for offset, content in enumerate(["old", "mid", "new"]):
+        test_db.add(
+            Memory(
+                user_id=1,
+                content=content,
+                embedding=[0.0],
+                memory_type="profile",
+                skill_id=skill.id,
+                created_at=base + timedelta(days=offset),
+            )
+        )
+    await test_db.commit()
+
+    samples = await MemSkillDesigner.get_recent_samples(skill.id, limit=2)
+
+    assert samples == [
+        {"content": "new", "created_at": str(base + timedelta(days=2))},
+        {"content": "mid", "created_at": str(base + timedelta(days=1))},
+    ]
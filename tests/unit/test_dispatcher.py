@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+
+from app.core.dispatcher import InterfaceDispatcher
+from app.core.mq import ChannelType, MessageType, UnifiedMessage
+
+
+async def test_dispatcher_sends_chats_concurrently_but_each_chat_in_order(mocker, monkeypatch):
+    messages = [
+        UnifiedMessage(channel=ChannelType.TELEGRAM, channel_id=chat, content=str(n), msg_type=MessageType.TEXT)
+        for n, chat in enumerate(["a", "b", "a", "b", "a"])
+    ]
+    pending = list(messages)
+
+    async def pop_outbox_blocking(timeout=1.0):
+        if pending:
+            return pending.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+    mocker.patch("app.core.dispatcher.MQService.pop_outbox_blocking", side_effect=pop_outbox_blocking)
+    sent = {"a": [], "b": []}
+    in_flight = 0
+    peak = 0
+
+    async def send(msg):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        sent[msg.channel_id].append(msg.content)
+        in_flight -= 1
+
+    monkeypatch.setattr(InterfaceDispatcher, "_send_handlers", {ChannelType.TELEGRAM: send})
+    # start()/stop() are mocked out by conftest, so wire the feeder and two workers up directly
+    queues = [asyncio.Queue(), asyncio.Queue()]
+    monkeypatch.setattr(InterfaceDispatcher, "_queues", queues)
+    monkeypatch.setattr(InterfaceDispatcher, "_channel_limits", {})
+    monkeypatch.setattr(InterfaceDispatcher, "_running", True)
+    # Pin the two chats to different workers so the overlap is deterministic
+    monkeypatch.setattr(InterfaceDispatcher, "_queue_for", classmethod(lambda cls, msg: queues[msg.channel_id == "b"]))
+    tasks = [asyncio.create_task(InterfaceDispatcher._worker(queue)) for queue in queues]
+    tasks.append(asyncio.create_task(InterfaceDispatcher._loop()))
+
+    async def drained():
+        while pending:
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*(queue.join() for queue in queues))
+
+    try:
+        await asyncio.wait_for(drained(), timeout=5)
+    finally:
+        InterfaceDispatcher._running = False
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert sent == {"a": ["0", "2", "4"], "b": ["1", "3"]}
+    assert peak == 2
+
+
+def _status_error(status: int, headers: dict | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://example.invalid/send")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+async def test_deliver_sends_permanent_errors_to_dlq_without_retrying(mocker, monkeypatch):
+    handler = mocker.AsyncMock(side_effect=_status_error(403))
+    monkeypatch.setattr(InterfaceDispatcher, "_send_handlers", {ChannelType.TELEGRAM: handler})
+    sleep = mocker.patch("app.core.dispatcher.asyncio.sleep")
+    dlq = mocker.patch("app.core.dispatcher.MQService.push_dlq")
+
+    await InterfaceDispatcher._deliver(UnifiedMessage(channel=ChannelType.TELEGRAM, channel_id="a", content="hi"))
+
+    assert handler.await_count == 1
+    sleep.assert_not_called()
+    dlq.assert_awaited_once()
+
+
+async def test_deliver_retries_transient_errors_with_jitter_or_retry_after(mocker, monkeypatch):
+    handler = mocker.AsyncMock(side_effect=[_status_error(503), _status_error(429, {"Retry-After": "7"}), None])
+    monkeypatch.setattr(InterfaceDispatcher, "_send_handlers", {ChannelType.TELEGRAM: handler})
+    mocker.patch("app.core.dispatcher.random.uniform", return_value=1.25)
+    sleep = mocker.patch("app.core.dispatcher.asyncio.sleep")
+    dlq = mocker.patch("app.core.dispatcher.MQService.push_dlq")
+
+    await InterfaceDispatcher._deliver(UnifiedMessage(channel=ChannelType.TELEGRAM, channel_id="a", content="hi"))
+
+    assert handler.await_count == 3
+    assert [call.args[0] for call in sleep.await_args_list] == [2.5, 7.0]
+    dlq.assert_not_called()
+
+
+async def test_builtin_handlers_register_once_without_overriding_bots(monkeypatch):
+    from app.interfaces.feishu import send_feishu_message
+
+    async def custom_telegram(msg):
+        return None
+
+    monkeypatch.setattr(InterfaceDispatcher, "_send_handlers", {ChannelType.TELEGRAM: custom_telegram})
+
+    InterfaceDispatcher._register_builtin_handlers()
+
+    assert await InterfaceDispatcher.get_handler(ChannelType.TELEGRAM) is custom_telegram
+    assert await InterfaceDispatcher.get_handler(ChannelType.FEISHU) is send_feishu_message
+    assert await InterfaceDispatcher.get_handler(ChannelType.DINGTALK) is None
+
+
+async def test_shutdown_returns_unsent_messages_instead_of_dropping_them(mocker, monkeypatch):
+    def message(chat: str, n: int) -> UnifiedMessage:
+        return UnifiedMessage(channel=ChannelType.TELEGRAM, channel_id=chat, content=str(n))
+
+    started = asyncio.Event()
+
+    async def send(msg):
+        started.set()
+        await asyncio.Event().wait()  # hangs until the worker is cancelled
+
+    monkeypatch.setattr(InterfaceDispatcher, "_send_handlers", {ChannelType.TELEGRAM: send})
+    monkeypatch.setattr(InterfaceDispatcher, "_channel_limits", {ChannelType.TELEGRAM: asyncio.Semaphore(1)})
+    dlq = mocker.patch("app.core.dispatcher.MQService.push_dlq")
+    outbox = mocker.patch("app.core.dispatcher.MQService.push_outbox_many")
+
+    # Worker "a" is mid-send; worker "b" waits for the channel slot that "a" holds
+    busy, waiting = asyncio.Queue(), asyncio.Queue()
+    monkeypatch.setattr(InterfaceDispatcher, "_queues", [busy, waiting])
+    for n in range(3):
+        busy.put_nowait(message("a", n))
+    waiting.put_nowait(message("b", 0))
+    workers = [asyncio.create_task(InterfaceDispatcher._worker(queue)) for queue in (busy, waiting)]
+    await started.wait()
+    await asyncio.sleep(0)
+
+    assert [m.content for m in InterfaceDispatcher._take_queued()] == ["1", "2"]
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+    assert dlq.await_args.args[0].channel_id == "a"
+    assert [call.args[0][0].channel_id for call in outbox.await_args_list] == ["b"]
+
+    # The feeder returns a message it popped but could not queue before being cancelled
+    full = asyncio.Queue(maxsize=1)
+    full.put_nowait(message("c", 0))
+    monkeypatch.setattr(InterfaceDispatcher, "_queues", [full])
+    monkeypatch.setattr(InterfaceDispatcher, "_running", True)
+    mocker.patch("app.core.dispatcher.MQService.pop_outbox_blocking", return_value=message("c", 1))
+    feeder = asyncio.create_task(InterfaceDispatcher._loop())
+    await asyncio.sleep(0.01)
+    feeder.cancel()
+    await asyncio.gather(feeder, return_exceptions=True)
+
+    assert outbox.await_args.args[0][0].content == "1"
@@ -0,0 +1,39 @@
+from app.core.i18n import get_text
+
+
+def test_get_text_formats_only_templates_with_placeholders():
+    assert get_text("bind_success", "zh-CN", user_id=7).startswith("✅ **成功！**")
+    assert "#7" in get_text("bind_success", "en", user_id=7)
+    assert get_text("typing", "en", unused="x") == "typing..."
+
+
+def test_get_text_falls_back_to_english_then_key(monkeypatch):
+    import app.core.i18n as i18n
+
+    monkeypatch.setattr(i18n, "_FLAT_STRINGS", {("en", "only_en"): "English"})
+
+    assert get_text("only_en", "zh") == "English"
+    assert get_text("missing", "zh") == "missing"
+
+
+def test_detect_language_samples_long_texts():
+    from app.core.i18n import detect_language
+
+    assert detect_language("") == "en"
+    assert detect_language("turn on the lights") == "en"
+    assert detect_language("please " * 100 + "开灯") == "zh"
+    assert detect_language("log line\n" * 2000) == "en"
+    assert detect_language("log line\n" * 2000 + "帮我看看这个日志") == "zh"
+    assert detect_language("这个日志怎么回事" * 600) == "zh"
+
+
+def test_resolve_language_prefers_user_setting_then_detects():
+    from types import SimpleNamespace
+
+    from app.core.i18n import resolve_language
+
+    assert resolve_language(SimpleNamespace(language="zh-CN"), "hello") == "zh"
+    assert resolve_language(SimpleNamespace(language="en"), "开灯") == "en"
+    assert resolve_language(SimpleNamespace(language=None), "开灯") == "zh"
+    assert resolve_language(object(), "hello") == "en"
+    assert resolve_language(None, "开灯") == "zh"
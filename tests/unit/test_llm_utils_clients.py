@@ -0,0 +1,155 @@
+from app.core import llm_utils
+
+
+def test_get_llm_client_reuses_instance_per_configuration(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+
+    first = llm_utils.get_llm_client(temperature=0, api_key="sk-test", base_url="http://localhost:9000/v1")
+    second = llm_utils.get_llm_client(temperature=0, api_key="sk-test", base_url="http://localhost:9000/v1")
+    warmer = llm_utils.get_llm_client(temperature=0.3, api_key="sk-test", base_url="http://localhost:9000/v1")
+
+    assert first is second
+    assert warmer is not first
+    assert first.http_async_client is not None
+
+
+def test_get_llm_client_raises_glm_flash_temperature_floor(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+
+    llm = llm_utils.get_llm_client(temperature=0, api_key="sk-test", model_name="glm-4.7-flash")
+
+    assert llm.temperature == 0.1
+
+
+async def test_llm_clients_are_closed_per_loop_and_dead_loops_pruned(monkeypatch):
+    import asyncio
+
+    dead_loop = asyncio.new_event_loop()
+    dead_loop.close()
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {dead_loop: {}})
+    monkeypatch.setattr(llm_utils, "_ASYNC_HTTP_CLIENTS", {})
+
+    llm = llm_utils.get_llm_client(temperature=0, api_key="sk-test", base_url="http://localhost:9000/v1")
+
+    assert dead_loop not in llm_utils._LLM_CLIENTS
+    await llm_utils.close_llm_clients()
+    assert llm.http_async_client.is_closed
+    assert llm_utils.get_llm_client(temperature=0, api_key="sk-test", base_url="http://localhost:9000/v1") is not llm
+
+
+async def test_llm_clients_share_one_pooled_http_client_per_loop(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+    monkeypatch.setattr(llm_utils, "_ASYNC_HTTP_CLIENTS", {})
+
+    cold = llm_utils.get_llm_client(temperature=0, api_key="sk-test", base_url="http://localhost:9000/v1")
+    warm = llm_utils.get_llm_client(temperature=0.3, api_key="sk-test", base_url="http://localhost:9000/v1")
+    hooked = llm_utils.get_httpx_async_client(event_hooks={"request": []}, base_url="http://localhost:9000/v1")
+
+    assert cold.http_async_client is warm.http_async_client
+    assert hooked is not cold.http_async_client
+    await hooked.aclose()
+    await llm_utils.close_llm_clients()
+    assert cold.http_async_client.is_closed
+
+
+def test_get_httpx_client_reuses_pooled_client(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_SYNC_HTTP_CLIENTS", {})
+
+    first = llm_utils.get_httpx_client(base_url="http://localhost:9000/v1")
+
+    assert llm_utils.get_httpx_client(base_url="http://127.0.0.1:9000/v1") is first
+    first.close()
+    assert llm_utils.get_httpx_client(base_url="http://localhost:9000/v1") is not first
+
+
+def test_client_settings_are_read_once_until_refreshed(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+    monkeypatch.setattr(llm_utils, "_env", llm_utils._env)
+    monkeypatch.setenv("LLM_MODEL", "env-model-b")
+
+    assert llm_utils.get_llm_client(api_key="sk-test").model_name != "env-model-b"
+    llm_utils._refresh_env()
+    assert llm_utils.get_llm_client(api_key="sk-test").model_name == "env-model-b"
+
+
+def test_is_local_url_matches_hostname_only():
+    assert llm_utils.is_local_url("http://localhost:11434/v1")
+    assert llm_utils.is_local_url("http://host.docker.internal:9292/v1")
+    assert llm_utils.is_local_url("127.0.0.1:8000")
+    assert not llm_utils.is_local_url("https://api.openai.com/v1")
+    assert not llm_utils.is_local_url("https://gateway.example.com/?upstream=localhost")
+    assert not llm_utils.is_local_url("")
+
+
+def test_sync_and_async_factories_share_proxy_resolution():
+    from dataclasses import replace
+
+    env = replace(llm_utils._env, system_proxy=False, telegram_proxy_url="socks5://proxy:1080")
+
+    assert llm_utils._proxy_settings("https://api.openai.com/v1", env) == (True, None)
+    env = replace(env, telegram_proxy_url="http://proxy:3128")
+    assert llm_utils._proxy_settings("https://api.openai.com/v1", env) == (True, "http://proxy:3128")
+    assert llm_utils._proxy_settings("http://localhost:11434/v1", env) == (False, None)
+
+
+def test_shared_clients_keep_idle_connections_between_turns(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_SYNC_HTTP_CLIENTS", {})
+
+    client = llm_utils.get_httpx_client(base_url="http://localhost:9000/v1")
+
+    assert client._transport._pool._keepalive_expiry == 30.0
+    client.close()
+
+
+def test_llm_requests_are_bounded(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+    monkeypatch.setattr(llm_utils, "_env", llm_utils._env)
+    monkeypatch.setenv("LLM_REQUEST_TIMEOUT", "45")
+    monkeypatch.setenv("LLM_MAX_TOKENS", "1024")
+    llm_utils._refresh_env()
+
+    llm = llm_utils.get_llm_client(api_key="sk-test", base_url="http://localhost:9000/v1")
+
+    assert (llm.request_timeout, llm.max_retries, llm.max_tokens) == (45.0, 2, 1024)
+
+
+def test_llm_streaming_follows_setting(monkeypatch):
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+    monkeypatch.setattr(llm_utils, "_env", llm_utils._env)
+
+    monkeypatch.delenv("LLM_STREAMING", raising=False)
+    llm_utils._refresh_env()
+    streamed = llm_utils.get_llm_client(api_key="sk-test", base_url="http://localhost:9000/v1")
+    monkeypatch.setattr(llm_utils, "_LLM_CLIENTS", {})
+    monkeypatch.setenv("LLM_STREAMING", "0")
+    llm_utils._refresh_env()
+    buffered = llm_utils.get_llm_client(api_key="sk-test", base_url="http://localhost:9000/v1")
+
+    assert (streamed.streaming, streamed.stream_usage) == (True, True)
+    assert (buffered.streaming, buffered.stream_usage) == (False, False)
+
+
+async def test_embeddings_client_is_shared_and_uses_pooled_http_client(monkeypatch):
+    from dataclasses import replace
+
+    monkeypatch.setattr(llm_utils, "_EMBEDDING_CLIENTS", {})
+    monkeypatch.setattr(llm_utils, "_ASYNC_HTTP_CLIENTS", {})
+    monkeypatch.setattr(
+        llm_utils, "_env", replace(llm_utils._env, embedding_base_url="http://localhost:8001/v1", embedding_api_key="k")
+    )
+
+    embeddings = llm_utils.get_embeddings_client()
+
+    assert llm_utils.get_embeddings_client() is embeddings
+    assert embeddings.http_async_client is llm_utils.get_httpx_async_client(base_url="http://localhost:8001/v1")
+    await llm_utils.close_llm_clients()
+
+
+def test_http2_is_only_requested_for_remote_urls(monkeypatch):
+    monkeypatch.setattr(llm_utils, "HAS_HTTP2", True)
+
+    assert llm_utils._client_options("https://api.openai.com/v1")["http2"] is True
+    assert llm_utils._client_options("http://localhost:11434/v1")["http2"] is False
+
+    monkeypatch.setattr(llm_utils, "HAS_HTTP2", False)
+    assert llm_utils._client_options("https://api.openai.com/v1")["http2"] is False
@@ -0,0 +1,53 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.core.semantic_cache import SemanticResponseCache
+
+
+class _FakeEmbeddings:
+    VECTORS = {
+        "what time is it": [1.0, 0.0],
+        "what's the time": [0.99, 0.05],
+        "turn on the lights": [0.0, 1.0],
+    }
+
+    async def aembed_query(self, text):
+        return self.VECTORS[text]
+
+
+def _cache(**kwargs):
+    return SemanticResponseCache(threshold=0.95, max_entries=8, ttl_seconds=60, embeddings=_FakeEmbeddings(), **kwargs)
+
+
+async def test_semantic_cache_reuses_reply_for_similar_query():
+    cache = _cache()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return AIMessage(content="It is noon.")
+
+    key = SemanticResponseCache.context_key(None, [SystemMessage(content="sys"), HumanMessage(content="x")], ["t"])
+    first = await cache.get_or_call("what time is it", key, call)
+    second = await cache.get_or_call("what's the time", key, call)
+    third = await cache.get_or_call("turn on the lights", key, call)
+
+    assert len(calls) == 2
+    assert first.content == second.content == "It is noon."
+    assert second.response_metadata == {"semantic_cache": "hit"}
+    assert third.content == "It is noon." and not third.response_metadata
+
+
+async def test_semantic_cache_skips_tool_calls_and_non_user_turns():
+    cache = _cache()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return AIMessage(content="", tool_calls=[{"name": "clock", "args": {}, "id": "1"}])
+
+    key = SemanticResponseCache.context_key(None, [HumanMessage(content="x")], [])
+    await cache.get_or_call("what time is it", key, call)
+    await cache.get_or_call("what time is it", key, call)
+
+    assert len(calls) == 2
+    assert SemanticResponseCache.context_key(None, [HumanMessage(content="x"), AIMessage(content="y")], []) is None
@@ -43,3 +43,21 @@ def test_tool_metadata_treats_entity_action_as_act():
     assert metadata["operation_kind"] == "act"
     assert metadata["side_effect"] is True
     assert metadata["requires_verification"] is True
+
+
+def test_get_tool_metadata_is_memoized_until_metadata_is_reassigned():
+    from langchain_core.tools import StructuredTool
+
+    from app.core.tool_metadata import get_tool_metadata
+
+    tool = StructuredTool.from_function(lambda query: query, name="search_docs", description="Search docs.")
+    first = get_tool_metadata(tool)
+
+    assert get_tool_metadata(tool) is first
+    assert first["operation_kind"] == "discover"
+
+    tool.metadata = {"required_role": "admin"}
+    updated = get_tool_metadata(tool)
+
+    assert updated is not first
+    assert updated["required_role"] == "admin"
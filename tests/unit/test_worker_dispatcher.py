@@ -4,6 +4,7 @@ from unittest.mock import patch
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
+from app.core.audit import PolicyDeniedError
 from app.core.tool_executor import build_tool_fingerprint
 from app.core.worker_dispatcher import WorkerDispatcher
 
@@ -103,6 +104,83 @@ async def test_execute_tool_call_allows_homeassistant_restart_for_admin():
     assert patch_result["execution_mode"] == "skill_act"
 
 
+@pytest.mark.asyncio
+async def test_execute_tool_call_reports_policy_block_as_permission_denied():
+    class DenyingAuditInterceptor(DummyAuditInterceptor):
+        async def __aenter__(self):
+            raise PolicyDeniedError("Access Denied: Role 'user' cannot use 'dummy_tool'")
+
+    with patch("app.core.worker_graphs.shared_execution.AuthService.check_tool_permission", return_value=True):
+        with patch("app.core.worker_graphs.shared_execution.AuditInterceptor", DenyingAuditInterceptor):
+            patch_result = await WorkerDispatcher.execute_tool_call(
+                {},
+                tool_name="dummy_tool",
+                tool_call_id="call-policy",
+                tool_args={},
+                tool_to_call=DummyTool(),
+                user=DummyUser(),
+                trace_id="trace-policy",
+            )
+
+    assert "Access Denied" in patch_result["message"].content
+    assert patch_result["outcome"]["status"] == "error"
+    assert patch_result["classification"]["category"] == "permission_denied"
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_call_does_not_report_tool_permission_error_as_policy_block():
+    class FileTool(DummyTool):
+        async def ainvoke(self, args):
+            raise PermissionError("[Errno 13] Permission denied: '/etc/shadow'")
+
+    with patch("app.core.worker_graphs.shared_execution.AuthService.check_tool_permission", return_value=True):
+        with patch("app.core.worker_graphs.shared_execution.AuditInterceptor", DummyAuditInterceptor):
+            patch_result = await WorkerDispatcher.execute_tool_call(
+                {},
+                tool_name="dummy_tool",
+                tool_call_id="call-fs",
+                tool_args={},
+                tool_to_call=FileTool(),
+                user=DummyUser(),
+                trace_id="trace-fs",
+            )
+
+    assert patch_result["message"].content.startswith("Error execution tool:")
+    assert patch_result["outcome"]["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_call_injects_context_args_only_when_declared():
+    from langchain_core.tools import StructuredTool
+
+    seen = {}
+
+    async def remember(query: str, user_id: int = None) -> str:
+        seen["remember"] = {"query": query, "user_id": user_id}
+        return "ok"
+
+    async def lookup(query: str) -> str:
+        return "ok"
+
+    caller_args = {"query": "tea"}
+    with patch("app.core.worker_graphs.shared_execution.AuthService.check_tool_permission", return_value=True):
+        with patch("app.core.worker_graphs.shared_execution.AuditInterceptor", DummyAuditInterceptor):
+            for fn in (remember, lookup):
+                patch_result = await WorkerDispatcher.execute_tool_call(
+                    {"session_id": 3},
+                    tool_name=fn.__name__,
+                    tool_call_id=f"call-{fn.__name__}",
+                    tool_args=caller_args,
+                    tool_to_call=StructuredTool.from_function(coroutine=fn, name=fn.__name__, description="d"),
+                    user=DummyUser(),
+                    trace_id="trace-ctx",
+                )
+                assert patch_result["outcome"]["status"] == "success"
+
+    assert seen["remember"] == {"query": "tea", "user_id": 7}
+    assert caller_args == {"query": "tea"}
+
+
 @pytest.mark.asyncio
 async def test_execute_tool_call_success():
     with patch("app.core.worker_graphs.shared_execution.AuthService.check_tool_permission", return_value=True):